@@ -1,14 +1,58 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
-from typing import List, Tuple
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from typing import Callable, Iterator, List, Optional, Tuple
 import math
+import os
+import time
 
 class Vector3:
+    __slots__ = ('_data', '_on_change')
+    
     def __init__(self, x: float, y: float, z: float):
-        self.x = x
-        self.y = y
-        self.z = z
+        self._data = np.array([x, y, z], dtype=float)
+        self._on_change = None
+    
+    @classmethod
+    def view(cls, row: np.ndarray, on_change: Optional[Callable[[], None]] = None) -> 'Vector3':
+        # Wrap a row of a vertex array without copying; writes go through to the array
+        vector = cls.__new__(cls)
+        vector._data = row
+        vector._on_change = on_change
+        return vector
+    
+    def _set(self, index: int, value: float):
+        self._data[index] = value
+        if self._on_change is not None:
+            self._on_change()
+    
+    @property
+    def x(self) -> float:
+        return float(self._data[0])
+    
+    @x.setter
+    def x(self, value: float):
+        self._set(0, value)
+    
+    @property
+    def y(self) -> float:
+        return float(self._data[1])
+    
+    @y.setter
+    def y(self, value: float):
+        self._set(1, value)
+    
+    @property
+    def z(self) -> float:
+        return float(self._data[2])
+    
+    @z.setter
+    def z(self, value: float):
+        self._set(2, value)
+    
+    def __repr__(self) -> str:
+        return f"Vector3({self.x}, {self.y}, {self.z})"
     
     def __add__(self, other: 'Vector3') -> 'Vector3':
         return Vector3(self.x + other.x, self.y + other.y, self.z + other.z)
@@ -37,7 +81,7 @@ class Vector3:
         return Vector3(self.x/mag, self.y/mag, self.z/mag) if mag != 0 else self
     
     def to_array(self) -> np.ndarray:
-        return np.array([self.x, self.y, self.z])
+        return np.array(self._data[:3], dtype=float)
 
 class Matrix4:
     def __init__(self, data: np.ndarray = None):
@@ -98,50 +142,217 @@ class Matrix4:
         homogenous = np.array([point.x, point.y, point.z, 1])
         transformed = self.data @ homogenous
         return Vector3(transformed[0], transformed[1], transformed[2])
+    
+    def transform_points(self, points: np.ndarray) -> np.ndarray:
+        # points is an (N, 4) homogeneous array; one matrix multiply for the whole batch
+        return points @ self.data.T
+
+def to_homogeneous(vertices) -> np.ndarray:
+    if isinstance(vertices, np.ndarray):
+        points = np.asarray(vertices, dtype=float)
+    else:
+        points = np.array([v.to_array() for v in vertices], dtype=float).reshape(-1, 3)
+    if points.ndim != 2 or points.shape[1] not in (3, 4):
+        raise ValueError(f"Expected an (N, 3) or (N, 4) vertex array, got shape {points.shape}")
+    if points.shape[1] == 4:
+        return np.ascontiguousarray(points)
+    homogeneous = np.ones((len(points), 4))
+    homogeneous[:, :3] = points
+    return homogeneous
+
+class SceneNode:
+    def __init__(self):
+        # Rows are position, rotation and scale; Vector3 views write straight into them
+        self._trs = np.array([[0, 0, 0], [0, 0, 0], [1, 1, 1]], dtype=float)
+        self.parent: Optional['SceneNode'] = None
+        self.children: List['SceneNode'] = []
+        self._local_matrix = Matrix4()
+        self._world_matrix = Matrix4()
+        self._local_dirty = True
+        self._world_dirty = True
+        self._world_version = 0
+    
+    def _trs_property(index: int):
+        def getter(self) -> Vector3:
+            return Vector3.view(self._trs[index], self.mark_dirty)
+        
+        def setter(self, value: Vector3):
+            self._trs[index] = value.to_array()
+            self.mark_dirty()
+        
+        return property(getter, setter)
+    
+    position = _trs_property(0)
+    rotation = _trs_property(1)
+    scale = _trs_property(2)
+    del _trs_property
+    
+    def mark_dirty(self):
+        self._local_dirty = True
+        self._invalidate_world()
+    
+    def _invalidate_world(self):
+        # A world-dirty node always has world-dirty descendants, so we can stop early
+        if self._world_dirty:
+            return
+        self._world_dirty = True
+        for child in self.children:
+            child._invalidate_world()
+    
+    def add_child(self, child: 'SceneNode') -> 'SceneNode':
+        if child.parent is not None:
+            child.parent.remove_child(child)
+        child.parent = self
+        self.children.append(child)
+        child._world_dirty = False
+        child._invalidate_world()
+        return child
+    
+    def remove_child(self, child: 'SceneNode'):
+        self.children.remove(child)
+        child.parent = None
+        child._world_dirty = False
+        child._invalidate_world()
+    
+    def walk(self) -> Iterator['SceneNode']:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+    
+    @property
+    def local_matrix(self) -> Matrix4:
+        if self._local_dirty:
+            (px, py, pz), (rx, ry, rz), (sx, sy, sz) = self._trs
+            self._local_matrix = (
+                Matrix4.translation(px, py, pz) @ Matrix4.rotation_x(rx) @
+                Matrix4.rotation_y(ry) @ Matrix4.rotation_z(rz) @ Matrix4.scale(sx, sy, sz)
+            )
+            self._local_dirty = False
+        return self._local_matrix
+    
+    @property
+    def world_matrix(self) -> Matrix4:
+        if self._world_dirty:
+            if self.parent is None:
+                self._world_matrix = self.local_matrix
+            else:
+                self._world_matrix = self.parent.world_matrix @ self.local_matrix
+            self._world_dirty = False
+            self._world_version += 1
+        return self._world_matrix
 
-class Mesh:
-    def __init__(self, vertices: List[Vector3], faces: List[Tuple[int, int, int]]):
-        self.vertices = vertices
+class Mesh(SceneNode):
+    def __init__(self, vertices, faces: List[Tuple[int, int, int]]):
+        super().__init__()
+        self.vertex_array = to_homogeneous(vertices)
         self.faces = faces
-        self.position = Vector3(0, 0, 0)
-        self.rotation = Vector3(0, 0, 0)
-        self.scale = Vector3(1, 1, 1)
     
     def get_transformation_matrix(self) -> Matrix4:
-        translation = Matrix4.translation(self.position.x, self.position.y, self.position.z)
-        rotation_x = Matrix4.rotation_x(self.rotation.x)
-        rotation_y = Matrix4.rotation_y(self.rotation.y)
-        rotation_z = Matrix4.rotation_z(self.rotation.z)
-        scale = Matrix4.scale(self.scale.x, self.scale.y, self.scale.z)
-        
-        return translation @ rotation_x @ rotation_y @ rotation_z @ scale
+        return self.world_matrix
+    
+    @property
+    def vertex_array(self) -> np.ndarray:
+        return self._vertex_array
+    
+    @vertex_array.setter
+    def vertex_array(self, vertex_array: np.ndarray):
+        self._vertex_array = vertex_array
+        self.invalidate_geometry()
+    
+    def invalidate_geometry(self):
+        # Call after editing vertex_array in place so the transformed cache is rebuilt
+        self._transformed = None
+    
+    @property
+    def vertices(self) -> List[Vector3]:
+        return [Vector3.view(row, self.invalidate_geometry) for row in self.vertex_array]
+    
+    @vertices.setter
+    def vertices(self, vertices):
+        self.vertex_array = to_homogeneous(vertices)
+    
+    def get_transformed_vertex_array(self) -> np.ndarray:
+        # Static meshes reuse last frame's result until their world matrix changes
+        transform = self.world_matrix
+        if self._transformed is None or self._transformed_version != self._world_version:
+            self._transformed = transform.transform_points(self.vertex_array)[:, :3]
+            self._transformed.setflags(write=False)
+            self._transformed_version = self._world_version
+        return self._transformed
     
     def get_transformed_vertices(self) -> List[Vector3]:
-        transform = self.get_transformation_matrix()
-        return [transform.transform_point(vertex) for vertex in self.vertices]
+        return [Vector3.view(row) for row in np.array(self.get_transformed_vertex_array())]
+    
+    @property
+    def faces(self) -> List[Tuple[int, int, int]]:
+        return [tuple(face) for face in self.face_array.tolist()]
+    
+    @faces.setter
+    def faces(self, faces):
+        self.face_array = np.asarray(faces, dtype=np.intp).reshape(-1, 3)
+    
+    def get_transformed_triangles(self) -> np.ndarray:
+        # (F, 3, 3) array: one row of three corner points per face
+        return self.get_transformed_vertex_array()[self.face_array]
+
+def face_normals(triangles: np.ndarray) -> np.ndarray:
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.where(lengths == 0, 1, lengths)
 
 class Renderer:
-    def __init__(self):
+    def __init__(self, batched: bool = True, cull_backfaces: bool = True):
         self.fig = plt.figure(figsize=(10, 8))
         self.ax = self.fig.add_subplot(111, projection='3d')
         self.meshes: List[Mesh] = []
+        self.batched = batched
+        self.cull_backfaces = cull_backfaces
+        self.light_direction = np.array([0.3, -0.5, 0.8]) / np.linalg.norm([0.3, -0.5, 0.8])
     
     def add_mesh(self, mesh: Mesh):
         self.meshes.append(mesh)
     
-    def render(self):
-        self.ax.clear()
-        
+    def view_direction(self) -> np.ndarray:
+        # Unit vector pointing from the scene towards the mplot3d camera
+        elev, azim = np.radians(self.ax.elev), np.radians(self.ax.azim)
+        return np.array([np.cos(elev) * np.cos(azim), np.cos(elev) * np.sin(azim), np.sin(elev)])
+    
+    def collect_triangles(self) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.meshes:
+            return np.empty((0, 3, 3)), np.empty((0, 3))
+        triangles = np.concatenate([mesh.get_transformed_triangles() for mesh in self.meshes])
+        normals = face_normals(triangles)
+        if self.cull_backfaces:
+            visible = normals @ self.view_direction() > 0
+            triangles, normals = triangles[visible], normals[visible]
+        return triangles, normals
+    
+    def draw_batched(self):
+        triangles, normals = self.collect_triangles()
+        shade = 0.3 + 0.7 * np.clip(normals @ self.light_direction, 0, 1)
+        colors = np.empty((len(triangles), 4))
+        colors[:, :3] = shade[:, None] * np.array([0.2, 0.5, 0.9])
+        colors[:, 3] = 0.8
+        self.ax.add_collection3d(Poly3DCollection(triangles, facecolors=colors, linewidths=0.5))
+    
+    def draw_per_face(self):
         for mesh in self.meshes:
-            vertices = mesh.get_transformed_vertices()
-            vertices_array = np.array([v.to_array() for v in vertices])
+            vertices_array = mesh.get_transformed_vertex_array()
             
             for face in mesh.faces:
                 triangle = vertices_array[list(face)]
                 self.ax.plot_trisurf(
                     triangle[:,0], triangle[:,1], triangle[:,2],
-                    alpha=0.8, linewidth=0.5
+                    triangles=[[0, 1, 2]], alpha=0.8, linewidth=0.5
                 )
+    
+    def draw(self):
+        self.ax.clear()
+        
+        if self.batched:
+            self.draw_batched()
+        else:
+            self.draw_per_face()
         
         self.ax.set_xlim(-5, 5)
         self.ax.set_ylim(-5, 5)
@@ -149,8 +360,153 @@ class Renderer:
         self.ax.set_xlabel('X')
         self.ax.set_ylabel('Y')
         self.ax.set_zlabel('Z')
+    
+    def render(self):
+        self.draw()
+        plt.show()
+
+class RasterRenderer:
+    def __init__(self, width: int = 640, height: int = 480, fov: float = 45.0,
+                 camera_position: Tuple[float, float, float] = (8.7, -15.0, 10.0),
+                 cull_backfaces: bool = True, max_samples: int = 1 << 21):
+        self.width = width
+        self.height = height
+        self.fov = fov
+        self.camera_position = np.array(camera_position, dtype=float)
+        self.camera_target = np.zeros(3)
+        self.camera_up = np.array([0.0, 0.0, 1.0])
+        self.meshes: List[Mesh] = []
+        self.cull_backfaces = cull_backfaces
+        # Upper bound on pixel samples evaluated at once; limits memory per triangle batch
+        self.max_samples = max_samples
+        self.near = 0.1
+        self.background = np.array([255, 255, 255], dtype=np.uint8)
+        self.base_color = np.array([0.2, 0.5, 0.9])
+        self.light_direction = np.array([0.3, -0.5, 0.8]) / np.linalg.norm([0.3, -0.5, 0.8])
+        self.image = np.empty((height, width, 3), dtype=np.uint8)
+        self.depth = np.empty((height, width))
+    
+    def add_mesh(self, mesh: Mesh):
+        self.meshes.append(mesh)
+    
+    def project(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # World points -> pixel coordinates (y down) and camera-space depth
+        forward = self.camera_target - self.camera_position
+        forward /= np.linalg.norm(forward)
+        right = np.cross(forward, self.camera_up)
+        right /= np.linalg.norm(right)
+        up = np.cross(right, forward)
+        
+        relative = points - self.camera_position
+        depth = relative @ forward
+        focal = (self.height / 2) / math.tan(math.radians(self.fov) / 2)
+        safe_depth = np.where(depth > self.near, depth, self.near)
+        screen = np.empty(points.shape[:-1] + (2,))
+        screen[..., 0] = self.width / 2 + focal * (relative @ right) / safe_depth
+        screen[..., 1] = self.height / 2 - focal * (relative @ up) / safe_depth
+        return screen, depth
+    
+    def draw(self) -> np.ndarray:
+        self.image[:] = self.background
+        self.depth.fill(np.inf)
+        if not self.meshes:
+            return self.image
+        
+        triangles = np.concatenate([mesh.get_transformed_triangles() for mesh in self.meshes])
+        normals = face_normals(triangles)
+        shade = 0.3 + 0.7 * np.clip(normals @ self.light_direction, 0, 1)
+        colors = (255 * shade[:, None] * self.base_color).astype(np.uint8)
+        
+        screen, depth = self.project(triangles)
+        # Triangles crossing the near plane are dropped rather than clipped
+        keep = (depth > self.near).all(axis=1)
+        area = edge_function(screen[:, 0], screen[:, 1], screen[:, 2])
+        # Screen y points down, so counter-clockwise front faces have positive area here
+        keep &= area > 0 if self.cull_backfaces else area != 0
+        self.rasterize(screen[keep], depth[keep], area[keep], colors[keep])
+        return self.image
+    
+    def rasterize(self, screen: np.ndarray, depth: np.ndarray, area: np.ndarray, colors: np.ndarray):
+        lower = np.floor(screen.min(axis=1)).astype(np.intp)
+        upper = np.ceil(screen.max(axis=1)).astype(np.intp)
+        lower = np.maximum(lower, 0)
+        upper = np.minimum(upper, [self.width - 1, self.height - 1])
+        size = upper - lower + 1
+        on_screen = (size > 0).all(axis=1)
+        screen, depth, area, colors = screen[on_screen], depth[on_screen], area[on_screen], colors[on_screen]
+        lower, upper, size = lower[on_screen], upper[on_screen], size[on_screen]
+        
+        # Sort by bounding-box area so each batch pads to a similar size
+        box_area = size[:, 0] * size[:, 1]
+        order = np.argsort(box_area, kind='stable')
+        box_area = box_area[order]
+        
+        start = 0
+        while start < len(order):
+            window = box_area[start:start + self.max_samples]
+            cost = np.arange(1, len(window) + 1) * window
+            count = max(1, int(np.searchsorted(cost, self.max_samples, side='right')))
+            batch = order[start:start + count]
+            self._rasterize_batch(screen[batch], depth[batch], area[batch], colors[batch],
+                                  lower[batch], upper[batch], size[batch].max(axis=0))
+            start += count
+    
+    def _rasterize_batch(self, screen, depth, area, colors, lower, upper, box_size):
+        xs = lower[:, 0, None, None] + np.arange(box_size[0])[None, None, :]
+        ys = lower[:, 1, None, None] + np.arange(box_size[1])[None, :, None]
+        px, py = xs + 0.5, ys + 0.5
+        
+        v0, v1, v2 = screen[:, 0, None, None], screen[:, 1, None, None], screen[:, 2, None, None]
+        inv_area = 1.0 / area[:, None, None]
+        b0 = ((px - v1[..., 0]) * (v2[..., 1] - v1[..., 1]) - (py - v1[..., 1]) * (v2[..., 0] - v1[..., 0])) * inv_area
+        b1 = ((px - v2[..., 0]) * (v0[..., 1] - v2[..., 1]) - (py - v2[..., 1]) * (v0[..., 0] - v2[..., 0])) * inv_area
+        b2 = 1.0 - b0 - b1
+        inside = (b0 >= 0) & (b1 >= 0) & (b2 >= 0)
+        inside &= (xs <= upper[:, 0, None, None]) & (ys <= upper[:, 1, None, None])
+        
+        # Interpolate 1/z linearly in screen space for perspective-correct depth
+        inv_depth = 1.0 / depth
+        z = 1.0 / (b0 * inv_depth[:, 0, None, None] + b1 * inv_depth[:, 1, None, None]
+                   + b2 * inv_depth[:, 2, None, None])
+        
+        shape = inside.shape
+        pixel = (np.broadcast_to(ys, shape) * self.width + np.broadcast_to(xs, shape))[inside]
+        triangle = np.broadcast_to(np.arange(len(screen))[:, None, None], shape)[inside]
+        z = z[inside]
         
+        depth_buffer = self.depth.reshape(-1)
+        np.minimum.at(depth_buffer, pixel, z)
+        nearest = z <= depth_buffer[pixel]
+        self.image.reshape(-1, 3)[pixel[nearest]] = colors[triangle[nearest]]
+    
+    def render(self):
+        plt.figure(figsize=(self.width / 100, self.height / 100))
+        plt.imshow(self.draw())
+        plt.axis('off')
         plt.show()
+    
+    def save_frame(self, path: str, image: Optional[np.ndarray] = None):
+        # .png goes through matplotlib; anything else is written as raw RGB24 bytes
+        image = self.image if image is None else image
+        if path.lower().endswith('.png'):
+            plt.imsave(path, image)
+        else:
+            image.tofile(path)
+    
+    def write_frames(self, directory: str, frame_count: int, update: Callable[[int], None],
+                     fmt: str = 'png') -> List[str]:
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for frame in range(frame_count):
+            update(frame)
+            self.draw()
+            path = os.path.join(directory, f"frame_{frame:05d}.{fmt}")
+            self.save_frame(path)
+            paths.append(path)
+        return paths
+
+def edge_function(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    return (c[..., 0] - a[..., 0]) * (b[..., 1] - a[..., 1]) - (c[..., 1] - a[..., 1]) * (b[..., 0] - a[..., 0])
 
 # Create a cube mesh
 def create_cube() -> Mesh:
@@ -158,19 +514,93 @@ def create_cube() -> Mesh:
         Vector3(-1, -1, -1), Vector3(1, -1, -1), Vector3(1, 1, -1), Vector3(-1, 1, -1),
         Vector3(-1, -1, 1), Vector3(1, -1, 1), Vector3(1, 1, 1), Vector3(-1, 1, 1)
     ]
+    # Counter-clockwise when seen from outside, so face normals point outwards
     faces = [
-        (0, 1, 2), (0, 2, 3),  # front
+        (0, 2, 1), (0, 3, 2),  # front
         (4, 5, 6), (4, 6, 7),  # back
         (0, 4, 7), (0, 7, 3),  # left
-        (1, 5, 6), (1, 6, 2),  # right
-        (3, 2, 6), (3, 6, 7),  # top
+        (1, 6, 5), (1, 2, 6),  # right
+        (3, 6, 2), (3, 7, 6),  # top
         (0, 1, 5), (0, 5, 4)   # bottom
     ]
     return Mesh(vertices, faces)
 
+# Create a sphere by repeatedly subdividing an icosahedron
+def create_sphere(subdivisions: int = 3, radius: float = 1.0) -> Mesh:
+    t = (1 + math.sqrt(5)) / 2
+    vertices = [
+        (-1, t, 0), (1, t, 0), (-1, -t, 0), (1, -t, 0),
+        (0, -1, t), (0, 1, t), (0, -1, -t), (0, 1, -t),
+        (t, 0, -1), (t, 0, 1), (-t, 0, -1), (-t, 0, 1)
+    ]
+    faces = [
+        (0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11),
+        (1, 5, 9), (5, 11, 4), (11, 10, 2), (10, 7, 6), (7, 1, 8),
+        (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8), (3, 8, 9),
+        (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1)
+    ]
+    
+    for _ in range(subdivisions):
+        midpoints = {}
+        
+        def midpoint(a: int, b: int) -> int:
+            key = (a, b) if a < b else (b, a)
+            if key not in midpoints:
+                va, vb = vertices[a], vertices[b]
+                vertices.append(tuple((pa + pb) / 2 for pa, pb in zip(va, vb)))
+                midpoints[key] = len(vertices) - 1
+            return midpoints[key]
+        
+        new_faces = []
+        for a, b, c in faces:
+            ab, bc, ca = midpoint(a, b), midpoint(b, c), midpoint(c, a)
+            new_faces.extend([(a, ab, ca), (b, bc, ab), (c, ca, bc), (ab, bc, ca)])
+        faces = new_faces
+    
+    points = np.array(vertices, dtype=float)
+    points *= radius / np.linalg.norm(points, axis=1, keepdims=True)
+    return Mesh(points, faces)
+
+def benchmark_render_fps(subdivisions: int = 5, frames: int = 10, batched: bool = True) -> float:
+    renderer = Renderer(batched=batched)
+    sphere = create_sphere(subdivisions, radius=3)
+    renderer.add_mesh(sphere)
+    
+    start = time.perf_counter()
+    for frame in range(frames):
+        sphere.rotation = Vector3(0, frame * 0.1, 0)
+        renderer.draw()
+        renderer.fig.canvas.draw()
+    elapsed = time.perf_counter() - start
+    plt.close(renderer.fig)
+    
+    fps = frames / elapsed
+    print(f"{len(sphere.face_array)} faces, batched={batched}: {fps:.2f} frames/sec")
+    return fps
+
+def benchmark_raster_tps(subdivisions: int = 5, frames: int = 10, width: int = 640, height: int = 480) -> float:
+    renderer = RasterRenderer(width, height)
+    sphere = create_sphere(subdivisions, radius=3)
+    renderer.add_mesh(sphere)
+    
+    start = time.perf_counter()
+    for frame in range(frames):
+        sphere.rotation = Vector3(0, frame * 0.1, 0)
+        renderer.draw()
+    elapsed = time.perf_counter() - start
+    
+    tps = frames * len(sphere.face_array) / elapsed
+    print(f"{len(sphere.face_array)} faces at {width}x{height}: {tps:,.0f} triangles/sec "
+          f"({frames / elapsed:.1f} frames/sec)")
+    return tps
+
 # Example usage
 renderer = Renderer()
 cube = create_cube()
 cube.rotation = Vector3(0.5, 0.5, 0)
 renderer.add_mesh(cube)
 renderer.render()
+
+# benchmark_render_fps(subdivisions=5)             # ~20k faces in one Poly3DCollection
+# benchmark_render_fps(subdivisions=2, batched=False)
+# benchmark_raster_tps(subdivisions=6)             # pure NumPy z-buffer backend
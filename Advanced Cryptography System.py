@@ -3,30 +3,119 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import base64
 import os
-from typing import Tuple
+import struct
+import time
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+STREAM_MAGIC = b"ACS1"
+# magic, chunk size, random 8-byte nonce prefix
+STREAM_HEADER = struct.Struct(">4sI8s")
+# ciphertext length, final-chunk flag
+CHUNK_HEADER = struct.Struct(">I?")
+# Upper bound on the plaintext chunk size, so a forged header cannot force a huge read
+MAX_STREAM_CHUNK = 64 * 1024 * 1024
+GCM_TAG_SIZE = 16
+
+@lru_cache(maxsize=128)
+def derive_key(password: str, salt: bytes) -> bytes:
+    # PBKDF2 is deliberately slow, so repeated (password, salt) pairs reuse the result
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+
+@lru_cache(maxsize=1024)
+def load_public_key(public_key_pem: bytes) -> rsa.RSAPublicKey:
+    # PEM parsing dominates small RSA operations, so each distinct key is parsed once
+    return serialization.load_pem_public_key(public_key_pem)
+
+def key_fingerprint(public_key: rsa.RSAPublicKey) -> str:
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    digest = hashes.Hash(hashes.SHA256())
+    digest.update(der)
+    return digest.finalize().hex()
+
+PSS_PADDING = padding.PSS(
+    mgf=padding.MGF1(hashes.SHA256()),
+    salt_length=padding.PSS.MAX_LENGTH
+)
+
+def verify_with_key(public_key: rsa.RSAPublicKey, data: bytes, signature: bytes) -> bool:
+    try:
+        public_key.verify(signature, data, PSS_PADDING, hashes.SHA256())
+        return True
+    except Exception:
+        return False
+
+# Pool workers load the signing key once in their initializer instead of per message
+_worker_private_key = None
+
+def _init_signing_worker(private_pem: bytes):
+    global _worker_private_key
+    _worker_private_key = serialization.load_pem_private_key(private_pem, password=None)
+
+def _sign_batch(messages: List[bytes]) -> List[bytes]:
+    return [_worker_private_key.sign(message, PSS_PADDING, hashes.SHA256()) for message in messages]
+
+def _verify_item(data: bytes, signature: bytes, pem: bytes) -> bool:
+    # A malformed key fails its own item rather than the whole batch
+    try:
+        public_key = load_public_key(pem)
+    except Exception:
+        return False
+    return verify_with_key(public_key, data, signature)
+
+def _verify_batch(items: List[Tuple[bytes, bytes, bytes]]) -> List[bool]:
+    return [_verify_item(data, signature, pem) for data, signature, pem in items]
+
+def _batches(items: Sequence, workers: int) -> List[Sequence]:
+    # A few batches per worker keeps the pool balanced without per-item IPC
+    size = max(1, -(-len(items) // (workers * 4)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
 class AdvancedCryptoSystem:
     def __init__(self):
         self.symmetric_key = None
         self.private_key = None
         self.public_key = None
+        self._fernet = None
+        self._fernet_key = None
     
     def generate_symmetric_key(self, password: str, salt: bytes = None) -> bytes:
         if salt is None:
+            # A fresh salt can never hit the cache, so don't let it evict useful entries
             salt = os.urandom(16)
-        
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+            key = derive_key.__wrapped__(password, salt)
+        else:
+            key = derive_key(password, salt)
         self.symmetric_key = key
         return key, salt
     
+    def generate_data_key(self) -> bytes:
+        # Random key for one-off payloads; no password, so no PBKDF2 needed
+        self.symmetric_key = Fernet.generate_key()
+        return self.symmetric_key
+    
+    def _get_fernet(self) -> Fernet:
+        if not self.symmetric_key:
+            raise ValueError("Symmetric key not generated")
+        if self._fernet_key != self.symmetric_key:
+            self._fernet = Fernet(self.symmetric_key)
+            self._fernet_key = self.symmetric_key
+        return self._fernet
+    
     def generate_asymmetric_keys(self) -> Tuple[bytes, bytes]:
         self.private_key = rsa.generate_private_key(
             public_exponent=65537,
@@ -48,23 +137,81 @@ class AdvancedCryptoSystem:
         return private_pem, public_pem
     
     def symmetric_encrypt(self, data: bytes) -> bytes:
-        if not self.symmetric_key:
-            raise ValueError("Symmetric key not generated")
-        
-        fernet = Fernet(self.symmetric_key)
-        return fernet.encrypt(data)
+        return self._get_fernet().encrypt(data)
     
     def symmetric_decrypt(self, encrypted_data: bytes) -> bytes:
+        return self._get_fernet().decrypt(encrypted_data)
+    
+    def _stream_cipher(self) -> AESGCM:
+        # Separate AES-256-GCM subkey so the Fernet key is never used by two algorithms
         if not self.symmetric_key:
             raise ValueError("Symmetric key not generated")
+        hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b"stream-aes-gcm")
+        return AESGCM(hkdf.derive(base64.urlsafe_b64decode(self.symmetric_key)))
+    
+    def encrypt_stream(self, source: BinaryIO, destination: BinaryIO, chunk_size: int = 64 * 1024):
+        # Each chunk is sealed separately with nonce = prefix || counter. The header,
+        # counter and final flag are authenticated, so chunks cannot be reordered,
+        # dropped or truncated without decryption failing.
+        if not 0 < chunk_size <= MAX_STREAM_CHUNK:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_STREAM_CHUNK}")
+        cipher = self._stream_cipher()
+        header = STREAM_HEADER.pack(STREAM_MAGIC, chunk_size, os.urandom(8))
+        destination.write(header)
+        
+        counter = 0
+        chunk = source.read(chunk_size)
+        while True:
+            next_chunk = source.read(chunk_size)
+            final = not next_chunk
+            ciphertext = cipher.encrypt(header[-8:] + counter.to_bytes(4, "big"), chunk,
+                                        header + counter.to_bytes(4, "big") + bytes([final]))
+            destination.write(CHUNK_HEADER.pack(len(ciphertext), final))
+            destination.write(ciphertext)
+            if final:
+                return
+            chunk = next_chunk
+            counter += 1
+    
+    def decrypt_stream(self, source: BinaryIO, destination: BinaryIO):
+        cipher = self._stream_cipher()
+        header = source.read(STREAM_HEADER.size)
+        if len(header) != STREAM_HEADER.size or STREAM_HEADER.unpack(header)[0] != STREAM_MAGIC:
+            raise ValueError("Not an encrypted stream")
+        chunk_size = STREAM_HEADER.unpack(header)[1]
+        if chunk_size > MAX_STREAM_CHUNK:
+            raise ValueError("Encrypted stream declares an oversized chunk")
         
-        fernet = Fernet(self.symmetric_key)
-        return fernet.decrypt(encrypted_data)
+        counter = 0
+        while True:
+            record = source.read(CHUNK_HEADER.size)
+            if len(record) != CHUNK_HEADER.size:
+                raise ValueError("Encrypted stream is truncated")
+            length, final = CHUNK_HEADER.unpack(record)
+            # Record headers are not authenticated until the chunk decrypts, so bound the read first
+            if length > chunk_size + GCM_TAG_SIZE:
+                raise ValueError("Encrypted stream has an oversized chunk")
+            ciphertext = source.read(length)
+            if len(ciphertext) != length:
+                raise ValueError("Encrypted stream is truncated")
+            destination.write(cipher.decrypt(header[-8:] + counter.to_bytes(4, "big"), ciphertext,
+                                             header + counter.to_bytes(4, "big") + bytes([final])))
+            if final:
+                return
+            counter += 1
+    
+    def encrypt_file(self, input_path: str, output_path: str, chunk_size: int = 64 * 1024):
+        with open(input_path, "rb") as source, open(output_path, "wb") as destination:
+            self.encrypt_stream(source, destination, chunk_size)
+    
+    def decrypt_file(self, input_path: str, output_path: str):
+        with open(input_path, "rb") as source, open(output_path, "wb") as destination:
+            self.decrypt_stream(source, destination)
     
     def asymmetric_encrypt(self, data: bytes, public_key_pem: bytes = None) -> bytes:
         public_key = public_key_pem or self.public_key
         if isinstance(public_key, bytes):
-            public_key = serialization.load_pem_public_key(public_key)
+            public_key = load_public_key(public_key)
         
         encrypted = public_key.encrypt(
             data,
@@ -94,35 +241,44 @@ class AdvancedCryptoSystem:
         if not self.private_key:
             raise ValueError("Private key not available")
         
-        signature = self.private_key.sign(
-            data,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+        signature = self.private_key.sign(data, PSS_PADDING, hashes.SHA256())
         return signature
     
     def verify_signature(self, data: bytes, signature: bytes, public_key_pem: bytes) -> bool:
-        public_key = serialization.load_pem_public_key(public_key_pem)
-        try:
-            public_key.verify(
-                signature,
-                data,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            return True
-        except:
-            return False
+        return verify_with_key(load_public_key(public_key_pem), data, signature)
+    
+    def sign_many(self, messages: List[bytes], workers: Optional[int] = None) -> List[bytes]:
+        if not self.private_key:
+            raise ValueError("Private key not available")
+        messages = list(messages)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            return [self.create_digital_signature(message) for message in messages]
+        
+        private_pem = self.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_signing_worker,
+                                 initargs=(private_pem,)) as executor:
+            return [signature for batch in executor.map(_sign_batch, _batches(messages, workers))
+                    for signature in batch]
+    
+    def verify_many(self, items: List[Tuple[bytes, bytes, bytes]], workers: Optional[int] = None) -> List[bool]:
+        # items are (data, signature, public_key_pem); one bool per item, in order
+        items = list(items)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            return _verify_batch(items)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return [valid for batch in executor.map(_verify_batch, _batches(items, workers))
+                    for valid in batch]
     
     def hybrid_encrypt(self, data: bytes, recipient_public_key: bytes) -> Tuple[bytes, bytes, bytes]:
-        # Generate ephemeral symmetric key
-        sym_key, salt = self.generate_symmetric_key(os.urandom(32).hex())
+        # Generate ephemeral symmetric key; the salt is kept in the return value for
+        # compatibility but is empty, as random data keys need no key derivation
+        sym_key, salt = self.generate_data_key(), b""
         
         # Encrypt data with symmetric key
         encrypted_data = self.symmetric_encrypt(data)
@@ -140,14 +296,65 @@ class AdvancedCryptoSystem:
         # Decrypt data with symmetric key
         return self.symmetric_decrypt(encrypted_data)
 
-# Example usage
-crypto = AdvancedCryptoSystem()
-private_key, public_key = crypto.generate_asymmetric_keys()
+    def hybrid_encrypt_many(self, data: bytes, recipient_public_keys: List[bytes]) -> Dict:
+        # Envelope for several recipients: the payload is encrypted once under a random
+        # data key, and only that 44-byte key is wrapped per recipient, keyed by the
+        # SHA-256 fingerprint of the recipient's public key
+        data_key = Fernet.generate_key()
+        wrapped_keys = {}
+        for public_key_pem in recipient_public_keys:
+            public_key = load_public_key(public_key_pem)
+            wrapped_keys[key_fingerprint(public_key)] = self.asymmetric_encrypt(data_key, public_key)
+        return {"ciphertext": Fernet(data_key).encrypt(data), "keys": wrapped_keys}
+    
+    def hybrid_decrypt_envelope(self, envelope: Dict) -> bytes:
+        if not self.private_key:
+            raise ValueError("Private key not available")
+        wrapped_key = envelope["keys"].get(key_fingerprint(self.public_key))
+        if wrapped_key is None:
+            raise ValueError("Envelope is not addressed to this key")
+        return Fernet(self.asymmetric_decrypt(wrapped_key)).decrypt(envelope["ciphertext"])
+
+def benchmark_signatures(count: int = 2000, worker_counts: Sequence[int] = (1, 2, 4, 8)) -> Dict[int, Tuple[float, float]]:
+    crypto = AdvancedCryptoSystem()
+    _, public_pem = crypto.generate_asymmetric_keys()
+    messages = [os.urandom(64) for _ in range(count)]
+    results = {}
+    for workers in worker_counts:
+        start = time.perf_counter()
+        signatures = crypto.sign_many(messages, workers)
+        sign_rate = count / (time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        crypto.verify_many([(m, s, public_pem) for m, s in zip(messages, signatures)], workers)
+        verify_rate = count / (time.perf_counter() - start)
+        
+        results[workers] = (sign_rate, verify_rate)
+        print(f"{workers} worker(s): {sign_rate:,.0f} signatures/sec, {verify_rate:,.0f} verifications/sec")
+    return results
+
+if __name__ == "__main__":
+    # Example usage
+    crypto = AdvancedCryptoSystem()
+    private_key, public_key = crypto.generate_asymmetric_keys()
+
+    # Hybrid encryption
+    data = b"Secret message"
+    encrypted_data, encrypted_key, salt = crypto.hybrid_encrypt(data, public_key)
+
+    # Hybrid decryption
+    decrypted = crypto.hybrid_decrypt(encrypted_data, encrypted_key, salt)
+    print("Decrypted:", decrypted.decode())
 
-# Hybrid encryption
-data = b"Secret message"
-encrypted_data, encrypted_key, salt = crypto.hybrid_encrypt(data, public_key)
+    # One payload for several recipients
+    alice, bob = AdvancedCryptoSystem(), AdvancedCryptoSystem()
+    alice_public = alice.generate_asymmetric_keys()[1]
+    bob_public = bob.generate_asymmetric_keys()[1]
+    envelope = crypto.hybrid_encrypt_many(b"Team announcement", [alice_public, bob_public])
+    print("Bob reads:", bob.hybrid_decrypt_envelope(envelope).decode())
 
-# Hybrid decryption
-decrypted = crypto.hybrid_decrypt(encrypted_data, encrypted_key, salt)
-print("Decrypted:", decrypted.decode())
+    # Bulk signing
+    signatures = crypto.sign_many([b"first", b"second"], workers=2)
+    # The second check pairs a message with the wrong signature, so it reports False
+    checks = [(b"first", signatures[0], public_key), (b"second", signatures[0], public_key)]
+    print("Bulk verify:", crypto.verify_many(checks, workers=2))
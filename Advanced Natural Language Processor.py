@@ -1,5 +1,7 @@
 import re
-from typing import List, Dict, Tuple
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Dict, Tuple
 from collections import Counter, defaultdict
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -10,13 +12,101 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize, sent_tokenize
 from nltk.stem import PorterStemmer, WordNetLemmatizer
 
+SPACY_MODEL = "en_core_web_sm"
+
+# Pipeline components each task can skip. The model itself is loaded once; these are
+# passed as disable= per call, so all tasks share one tok2vec, vocab and string store.
+SPACY_DISABLE = {
+    "ner": ["tagger", "parser", "attribute_ruler", "lemmatizer"],
+    "parser": ["tagger", "attribute_ruler", "lemmatizer", "ner"],
+}
+
+# Process-wide registry: every model and corpus is loaded at most once per process,
+# on first use, and its load time is recorded
+_registry: Dict[str, object] = {}
+_load_times: Dict[str, float] = {}
+_registry_lock = threading.Lock()
+
+def get_resource(key: str, loader: Callable[[], object]) -> object:
+    resource = _registry.get(key)
+    if resource is None:
+        with _registry_lock:
+            resource = _registry.get(key)
+            if resource is None:
+                start = time.perf_counter()
+                resource = loader()
+                _load_times[key] = time.perf_counter() - start
+                _registry[key] = resource
+    return resource
+
+def get_spacy_model(name: str = SPACY_MODEL):
+    return get_resource(f"spacy:{name}", lambda: spacy.load(name))
+
+def get_stop_words() -> frozenset:
+    return get_resource("nltk:stopwords", lambda: frozenset(stopwords.words('english')))
+
+def get_stemmer() -> PorterStemmer:
+    return get_resource("nltk:stemmer", PorterStemmer)
+
+def get_lemmatizer() -> WordNetLemmatizer:
+    return get_resource("nltk:lemmatizer", WordNetLemmatizer)
+
+def preload(*names: str):
+    # Warm the registry before forking workers so they share the loaded pages
+    for name in names or (SPACY_MODEL,):
+        get_spacy_model(name)
+    get_stop_words()
+    get_stemmer()
+    get_lemmatizer()
+
+def model_load_times() -> Dict[str, float]:
+    return dict(_load_times)
+
 class AdvancedNLP:
+    # Models come from the process-wide registry, so creating an instance is free and
+    # nothing is loaded until a method needs it. Assigning an attribute overrides the
+    # shared resource for this instance only.
     def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.stop_words = set(stopwords.words('english'))
-        self.stemmer = PorterStemmer()
-        self.lemmatizer = WordNetLemmatizer()
-        
+        self._nlp = None
+        self._stop_words = None
+        self._stemmer = None
+        self._lemmatizer = None
+    
+    @property
+    def nlp(self):
+        return self._nlp if self._nlp is not None else get_spacy_model()
+    
+    @nlp.setter
+    def nlp(self, value):
+        self._nlp = value
+    
+    @property
+    def stop_words(self) -> set:
+        # Copied on first access so in-place edits stay local to this instance
+        if self._stop_words is None:
+            self._stop_words = set(get_stop_words())
+        return self._stop_words
+    
+    @stop_words.setter
+    def stop_words(self, value: set):
+        self._stop_words = value
+    
+    @property
+    def stemmer(self) -> PorterStemmer:
+        return self._stemmer if self._stemmer is not None else get_stemmer()
+    
+    @stemmer.setter
+    def stemmer(self, value: PorterStemmer):
+        self._stemmer = value
+    
+    @property
+    def lemmatizer(self) -> WordNetLemmatizer:
+        return self._lemmatizer if self._lemmatizer is not None else get_lemmatizer()
+    
+    @lemmatizer.setter
+    def lemmatizer(self, value: WordNetLemmatizer):
+        self._lemmatizer = value
+    
     def preprocess_text(self, text: str) -> str:
         # Remove special characters and digits
         text = re.sub(r'[^a-zA-Z\s]', '', text)
@@ -28,13 +118,20 @@ class AdvancedNLP:
         tokens = [self.stemmer.stem(token) for token in tokens if token not in self.stop_words]
         return ' '.join(tokens)
     
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
-        doc = self.nlp(text)
+    @staticmethod
+    def _grouped_entities(doc) -> Dict[str, List[str]]:
         entities = defaultdict(list)
         for ent in doc.ents:
             entities[ent.label_].append(ent.text)
         return dict(entities)
     
+    @staticmethod
+    def _dependencies(doc) -> List[Tuple[str, str, str]]:
+        return [(token.text, token.dep_, token.head.text) for token in doc]
+    
+    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+        return self._grouped_entities(self.nlp(text, disable=SPACY_DISABLE["ner"]))
+    
     def sentiment_analysis(self, text: str) -> float:
         # Simple sentiment analysis using word scores
         positive_words = {'good', 'great', 'excellent', 'amazing', 'wonderful'}
@@ -85,12 +182,24 @@ class AdvancedNLP:
         return ' '.join(sentences[i] for i, _ in top_sentences)
     
     def named_entity_recognition(self, text: str) -> List[Tuple[str, str]]:
-        doc = self.nlp(text)
+        doc = self.nlp(text, disable=SPACY_DISABLE["ner"])
         return [(ent.text, ent.label_) for ent in doc.ents]
     
     def dependency_parsing(self, text: str) -> List[Tuple[str, str, str]]:
-        doc = self.nlp(text)
-        return [(token.text, token.dep_, token.head.text) for token in doc]
+        return self._dependencies(self.nlp(text, disable=SPACY_DISABLE["parser"]))
+    
+    def process_batch(self, texts: Iterable[str], batch_size: int = 256, n_process: int = 1) -> Iterator[Dict]:
+        # Parses each document once with NER and the parser together, streaming results
+        # in input order. With n_process > 1 spaCy forks workers that inherit the loaded
+        # pipeline, so call preload() first when building a worker pool.
+        for doc in self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process,
+                                 disable=["tagger", "attribute_ruler", "lemmatizer"]):
+            yield {
+                "entities": self._grouped_entities(doc),
+                "named_entities": [(ent.text, ent.label_) for ent in doc.ents],
+                "dependencies": self._dependencies(doc),
+                "tokens": [token.text for token in doc],
+            }
 
 # Example usage
 nlp = AdvancedNLP()
@@ -98,3 +207,6 @@ text = "Apple Inc. is planning to open a new store in New York City next month."
 print("Entities:", nlp.extract_entities(text))
 print("Sentiment:", nlp.sentiment_analysis(text))
 print("Keywords:", nlp.keyword_extraction(text))
+for result in nlp.process_batch([text, "Tim Cook visited Berlin on Monday."], batch_size=64):
+    print("Batch:", result["entities"], result["tokens"][:5])
+print("Model load times:", model_load_times())
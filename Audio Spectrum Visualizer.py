@@ -3,8 +3,10 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 wf = wave.open("sample.wav", "rb")
-frames = wf.readframes(wf.getnframes())
+frames = wf.readframes(1000)  # only the plotted chunk is read from disk
 data = np.frombuffer(frames, dtype=np.int16)
+if wf.getnchannels() > 1:
+    data = data[::wf.getnchannels()]
 plt.plot(data[:1000])
 plt.title("Waveform (first chunk)")
 plt.show()
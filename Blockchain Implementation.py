@@ -1,11 +1,21 @@
 import hashlib
 import json
+import mmap
+import os
+import struct
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 
+@lru_cache(maxsize=4096)
+def load_public_key(sender: str) -> rsa.RSAPublicKey:
+    # Senders are hex RSA moduli; decoding one is cached per process
+    return rsa.RSAPublicNumbers(e=65537, n=int.from_bytes(bytes.fromhex(sender), 'big')).public_key()
+
 @dataclass
 class Transaction:
     sender: str
@@ -22,6 +32,15 @@ class Transaction:
             'timestamp': self.timestamp
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Transaction':
+        signature = data.get('signature')
+        return cls(data['sender'], data['receiver'], data['amount'], data['timestamp'],
+                   bytes.fromhex(signature) if signature else None)
+
+    def hash(self) -> bytes:
+        return hashlib.sha256(json.dumps(self.to_dict(), sort_keys=True).encode()).digest()
+
     def sign(self, private_key: rsa.RSAPrivateKey):
         data = json.dumps(self.to_dict(), sort_keys=True).encode()
         self.signature = private_key.sign(
@@ -36,12 +55,9 @@ class Transaction:
     def verify_signature(self) -> bool:
         if not self.signature:
             return False
-        public_key = rsa.RSAPublicNumbers(
-            int.from_bytes(bytes.fromhex(self.sender), 'big'),
-            65537
-        ).public_key()
         data = json.dumps(self.to_dict(), sort_keys=True).encode()
         try:
+            public_key = load_public_key(self.sender)
             public_key.verify(
                 self.signature,
                 data,
@@ -55,6 +71,69 @@ class Transaction:
         except:
             return False
 
+def verify_transactions(transactions: List[Transaction]) -> List[bool]:
+    # Runs in pool workers; each worker keeps its own load_public_key cache
+    return [tx.verify_signature() for tx in transactions]
+
+class MerkleTree:
+    # Leaves and inner nodes are hashed with different prefixes so a leaf can never be
+    # passed off as an inner node. An unpaired node at the end of a level is promoted
+    # unchanged rather than duplicated.
+    def __init__(self, leaves: List[bytes]):
+        self.levels: List[List[bytes]] = [[hashlib.sha256(b'\x00' + leaf).digest() for leaf in leaves]]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parents = [hashlib.sha256(b'\x01' + level[i] + level[i + 1]).digest()
+                       for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            self.levels.append(parents)
+
+    @property
+    def root(self) -> bytes:
+        if not self.levels[0]:
+            return hashlib.sha256(b'').digest()
+        return self.levels[-1][0]
+
+    def proof(self, index: int) -> List[Tuple[str, bool]]:
+        # Sibling hashes from leaf to root, each flagged True when the sibling is on the left
+        if not 0 <= index < len(self.levels[0]):
+            raise IndexError(f"Leaf {index} out of range for {len(self.levels[0])} leaves")
+        path = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append((level[sibling].hex(), sibling < index))
+            index //= 2
+        return path
+
+    @staticmethod
+    def verify(leaf: bytes, proof: List[Tuple[str, bool]], root: bytes) -> bool:
+        node = hashlib.sha256(b'\x00' + leaf).digest()
+        for sibling_hex, sibling_is_left in proof:
+            sibling = bytes.fromhex(sibling_hex)
+            pair = sibling + node if sibling_is_left else node + sibling
+            node = hashlib.sha256(b'\x01' + pair).digest()
+        return node == root
+
+def verify_transaction_inclusion(transaction: Transaction, proof: List[Tuple[str, bool]], merkle_root: str) -> bool:
+    # Light-client check: needs only the transaction, its proof and the block's Merkle root
+    return MerkleTree.verify(transaction.hash(), proof, bytes.fromhex(merkle_root))
+
+def difficulty_target(difficulty: int) -> int:
+    # A hex digest starts with `difficulty` zeros exactly when the digest,
+    # read as a 256-bit integer, is below this value
+    return 1 << (256 - 4 * difficulty)
+
+def search_nonces(header: bytes, target: int, start: int, stop: int) -> Optional[int]:
+    base = hashlib.sha256(header)
+    for nonce in range(start, stop):
+        candidate = base.copy()
+        candidate.update(nonce.to_bytes(8, 'big'))
+        if int.from_bytes(candidate.digest(), 'big') < target:
+            return nonce
+    return None
+
 class Block:
     def __init__(self, index: int, transactions: List[Transaction], previous_hash: str):
         self.index = index
@@ -62,30 +141,294 @@ class Block:
         self.timestamp = time.time()
         self.previous_hash = previous_hash
         self.nonce = 0
+        self.merkle_tree = MerkleTree([tx.hash() for tx in transactions])
+        self._transaction_positions: Optional[Dict[bytes, int]] = None
         self.hash = self.calculate_hash()
 
-    def calculate_hash(self) -> str:
-        block_string = json.dumps({
+    @property
+    def merkle_root(self) -> str:
+        return self.merkle_tree.root.hex()
+
+    def to_dict(self) -> Dict:
+        return {
             'index': self.index,
-            'transactions': [tx.to_dict() for tx in self.transactions],
+            'transactions': [dict(tx.to_dict(), signature=tx.signature.hex() if tx.signature else None)
+                             for tx in self.transactions],
             'timestamp': self.timestamp,
             'previous_hash': self.previous_hash,
-            'nonce': self.nonce
-        }, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+            'nonce': self.nonce,
+            'hash': self.hash
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Block':
+        # Restores the stored hash as-is; is_chain_valid is what checks it
+        block = cls.__new__(cls)
+        block.index = data['index']
+        block.transactions = [Transaction.from_dict(tx) for tx in data['transactions']]
+        block.timestamp = data['timestamp']
+        block.previous_hash = data['previous_hash']
+        block.nonce = data['nonce']
+        block.merkle_tree = MerkleTree([tx.hash() for tx in block.transactions])
+        block._transaction_positions = None
+        block.hash = data['hash']
+        return block
+
+    def get_transaction_proof(self, transaction: Transaction) -> Optional[List[Tuple[str, bool]]]:
+        if self._transaction_positions is None:
+            self._transaction_positions = {tx.hash(): i for i, tx in enumerate(self.transactions)}
+        index = self._transaction_positions.get(transaction.hash())
+        return None if index is None else self.merkle_tree.proof(index)
+
+    def header_bytes(self) -> bytes:
+        # Everything except the nonce; transactions enter only through their Merkle root,
+        # rebuilt here so that tampering with a stored transaction changes the hash
+        root = MerkleTree([tx.hash() for tx in self.transactions]).root
+        return json.dumps({
+            'index': self.index,
+            'merkle_root': root.hex(),
+            'timestamp': self.timestamp,
+            'previous_hash': self.previous_hash
+        }, sort_keys=True).encode()
+
+    def calculate_hash(self) -> str:
+        digest = hashlib.sha256(self.header_bytes())
+        digest.update(self.nonce.to_bytes(8, 'big'))
+        return digest.hexdigest()
+
+    def mine_block(self, difficulty: int, workers: Optional[int] = 1, chunk_size: int = 50_000):
+        header = self.header_bytes()
+        target = difficulty_target(difficulty)
+        if workers == 1:
+            nonce = None
+            start = self.nonce
+            while nonce is None:
+                nonce = search_nonces(header, target, start, start + chunk_size)
+                start += chunk_size
+        else:
+            nonce = self._mine_parallel(header, target, workers or os.cpu_count() or 1, chunk_size)
+        self.nonce = nonce
+        self.hash = self.calculate_hash()
+
+    def _mine_parallel(self, header: bytes, target: int, workers: int, chunk_size: int) -> int:
+        # Hand out consecutive nonce ranges and stop submitting work once any range hits;
+        # queued ranges are cancelled, ranges already running finish their short chunk.
+        next_start = self.nonce
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = set()
+            while True:
+                while len(in_flight) < 2 * workers:
+                    in_flight.add(executor.submit(search_nonces, header, target,
+                                                  next_start, next_start + chunk_size))
+                    next_start += chunk_size
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                found = [future.result() for future in done if future.result() is not None]
+                if found:
+                    for future in in_flight:
+                        future.cancel()
+                    return min(found)
+
+class BlockStore:
+    # Append-only block log split into segment files, plus a fixed-width index with one
+    # record per height (hash, segment, offset, length). Opening a store only stats the
+    # index, so startup is O(1); blocks are read lazily through memory maps.
+    INDEX_RECORD = struct.Struct('>32sIQI')
+
+    def __init__(self, directory: str, segment_size: int = 64 * 1024 * 1024, cache_size: int = 1024):
+        self.directory = directory
+        self.segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+        self._index_file = open(os.path.join(directory, 'index.bin'), 'a+b')
+        self._index_file.seek(0, os.SEEK_END)
+        self._count = self._index_file.tell() // self.INDEX_RECORD.size
+        # A crash mid-append can leave a torn index record; drop it so later records stay aligned
+        if self._index_file.tell() != self._count * self.INDEX_RECORD.size:
+            self._index_file.truncate(self._count * self.INDEX_RECORD.size)
+            self._index_file.seek(0, os.SEEK_END)
+        self._segment = self._last_segment()
+        self._segment_file = open(self._segment_path(self._segment), 'a+b')
+        self._maps: Dict[str, Tuple[mmap.mmap, int]] = {}
+        self._hash_to_height: Optional[Dict[str, int]] = None
+        self._read_block = lru_cache(maxsize=cache_size)(self._read_block_uncached)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f'blocks_{segment:05d}.log')
+
+    def _last_segment(self) -> int:
+        segments = [int(name[7:12]) for name in os.listdir(self.directory)
+                    if name.startswith('blocks_') and name.endswith('.log')]
+        return max(segments, default=0)
+
+    def _map(self, path: str, size: int) -> mmap.mmap:
+        # Maps are reused until a read reaches past their end, e.g. in the active segment
+        mapped = self._maps.get(path)
+        if mapped is None or mapped[1] < size:
+            if mapped is not None:
+                mapped[0].close()
+            with open(path, 'rb') as f:
+                length = os.fstat(f.fileno()).st_size
+                mapped = (mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ), length)
+            self._maps[path] = mapped
+        return mapped[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _index_record(self, height: int) -> Tuple[bytes, int, int, int]:
+        end = (height + 1) * self.INDEX_RECORD.size
+        index = self._map(os.path.join(self.directory, 'index.bin'), end)
+        return self.INDEX_RECORD.unpack_from(index, height * self.INDEX_RECORD.size)
+
+    def append(self, block: Block) -> int:
+        data = json.dumps(block.to_dict(), sort_keys=True).encode() + b'\n'
+        self._segment_file.seek(0, os.SEEK_END)
+        if self._segment_file.tell() and self._segment_file.tell() + len(data) > self.segment_size:
+            self._segment_file.close()
+            self._segment += 1
+            self._segment_file = open(self._segment_path(self._segment), 'a+b')
+        offset = self._segment_file.tell()
+        self._segment_file.write(data)
+        self._segment_file.flush()
 
-    def mine_block(self, difficulty: int):
-        target = '0' * difficulty
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
-            self.hash = self.calculate_hash()
+        # The index record is written last, so a crash leaves at most unreferenced segment
+        # bytes and a torn index record, which __init__ drops
+        self._index_file.write(self.INDEX_RECORD.pack(bytes.fromhex(block.hash), self._segment, offset, len(data)))
+        self._index_file.flush()
+        if self._hash_to_height is not None:
+            self._hash_to_height[block.hash] = self._count
+        self._count += 1
+        return self._count - 1
+
+    def _read_block_uncached(self, height: int) -> Block:
+        _, segment, offset, length = self._index_record(height)
+        data = self._map(self._segment_path(segment), offset + length)[offset:offset + length]
+        return Block.from_dict(json.loads(data))
+
+    def get(self, height: int) -> Block:
+        if height < 0:
+            height += self._count
+        if not 0 <= height < self._count:
+            raise IndexError(f"Block height {height} out of range for {self._count} blocks")
+        return self._read_block(height)
+
+    def get_by_hash(self, block_hash: str) -> Optional[Block]:
+        if self._hash_to_height is None:
+            # Built on first use so that opening the store stays O(1)
+            self._hash_to_height = {self._index_record(h)[0].hex(): h for h in range(self._count)}
+        height = self._hash_to_height.get(block_hash)
+        return None if height is None else self.get(height)
+
+    def truncate(self, length: int):
+        # Drops every block from height `length` on; their bytes stay in the segment
+        # files but are no longer referenced by the index
+        if not 0 < length <= self._count:
+            raise ValueError(f"Cannot truncate a store of {self._count} blocks to {length}")
+        for mapped, _ in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+        self._index_file.truncate(length * self.INDEX_RECORD.size)
+        self._index_file.seek(0, os.SEEK_END)
+        self._count = length
+        self._read_block.cache_clear()
+        self._hash_to_height = None
+
+    def save_metadata(self, name: str, data: Dict):
+        path = os.path.join(self.directory, f'{name}.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+
+    def load_metadata(self, name: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self.directory, f'{name}.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_checkpoint(self, height: int, block_hash: str):
+        self.save_metadata('checkpoint', {'height': height, 'hash': block_hash})
+
+    def load_checkpoint(self) -> Optional[Tuple[int, str]]:
+        checkpoint = self.load_metadata('checkpoint')
+        return None if checkpoint is None else (checkpoint['height'], checkpoint['hash'])
+
+    def close(self):
+        for mapped, _ in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+        self._segment_file.close()
+        self._index_file.close()
+
+class StoredChain:
+    # List-like view over a BlockStore so Blockchain can index, slice and append as usual
+    def __init__(self, store: BlockStore):
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.store.get(i) for i in range(*key.indices(len(self.store)))]
+        return self.store.get(key)
+
+    def __iter__(self):
+        return (self.store.get(i) for i in range(len(self.store)))
+
+    def append(self, block: Block):
+        self.store.append(block)
+
+    def pop(self) -> Block:
+        block = self.store.get(-1)
+        self.store.truncate(len(self.store) - 1)
+        return block
+
+def validate_segment(blocks: List[Block], previous_hash: str) -> bool:
+    # Checks a run of consecutive blocks; previous_hash is the hash of the block before it
+    for block in blocks:
+        if block.hash != block.calculate_hash():
+            return False
+        if block.previous_hash != previous_hash:
+            return False
+        previous_hash = block.hash
+    return True
 
 class Blockchain:
-    def __init__(self, difficulty: int = 2):
-        self.chain: List[Block] = [self.create_genesis_block()]
+    def __init__(self, difficulty: int = 2, store: Optional[BlockStore] = None,
+                 max_reorg_depth: int = 100, snapshot_interval: int = 100):
+        # With a store the chain lives on disk and survives restarts; blocks are only
+        # read when something asks for them
+        self.store = store
+        if store is None:
+            self.chain: List[Block] = [self.create_genesis_block()]
+        else:
+            self.chain = StoredChain(store)
+            if not len(store):
+                store.append(self.create_genesis_block())
         self.difficulty = difficulty
         self.pending_transactions: List[Transaction] = []
         self.mining_reward = 10
+        self.mining_workers = 1  # None uses every core
+        # Height and hash of the last block is_chain_valid has checked; blocks up to it
+        # are not re-hashed again unless a full revalidation is requested
+        self.validated_height = 0
+        self.validated_hash = self.chain[0].hash
+        if store is not None and store.load_checkpoint() is not None:
+            self.validated_height, self.validated_hash = store.load_checkpoint()
+
+        # Confirmed balance per address, updated block by block. rollback() reverts a
+        # block from its own transactions, at most max_reorg_depth blocks deep;
+        # pending_spent holds what mempool transactions already commit per sender.
+        self.balances: Dict[str, float] = {}
+        self.max_reorg_depth = max_reorg_depth
+        self.pending_spent: Dict[str, float] = {}
+        self.snapshot_interval = snapshot_interval
+        self.balance_height = 0
+        snapshot = store.load_metadata('balances') if store is not None else None
+        if snapshot is not None and snapshot['height'] < len(self.chain):
+            self.balances, self.balance_height = snapshot['balances'], snapshot['height']
+        for height in range(self.balance_height + 1, len(self.chain)):
+            self._apply_block(self.chain[height])
 
     def create_genesis_block(self) -> Block:
         return Block(0, [], "0")
@@ -93,29 +436,134 @@ class Blockchain:
     def get_latest_block(self) -> Block:
         return self.chain[-1]
 
+    def get_balance(self, address: str) -> float:
+        return self.balances.get(address, 0)
+
+    def _reserve_funds(self, transaction: Transaction) -> bool:
+        available = self.get_balance(transaction.sender) - self.pending_spent.get(transaction.sender, 0)
+        if transaction.amount <= 0 or transaction.amount > available:
+            return False
+        self.pending_spent[transaction.sender] = self.pending_spent.get(transaction.sender, 0) + transaction.amount
+        return True
+
+    @staticmethod
+    def _balance_deltas(block: Block) -> Dict[str, float]:
+        deltas: Dict[str, float] = {}
+        for tx in block.transactions:
+            if tx.sender:  # an empty sender is a mining reward
+                deltas[tx.sender] = deltas.get(tx.sender, 0) - tx.amount
+            deltas[tx.receiver] = deltas.get(tx.receiver, 0) + tx.amount
+        return deltas
+
+    def _apply_block(self, block: Block):
+        for address, delta in self._balance_deltas(block).items():
+            self.balances[address] = self.balances.get(address, 0) + delta
+        self.balance_height = block.index
+        if self.store is not None and block.index % self.snapshot_interval == 0:
+            self._save_balance_snapshot()
+
+    def _save_balance_snapshot(self):
+        self.store.save_metadata('balances', {'height': self.balance_height, 'balances': self.balances})
+
+    def rollback(self, height: int) -> List[Block]:
+        # Removes the blocks above `height` and reverts their balance changes; returns
+        # them newest first so their transactions can be re-submitted after a reorg
+        depth = len(self.chain) - 1 - height
+        if height < 0 or depth < 0:
+            raise ValueError(f"Cannot roll back a chain of {len(self.chain)} blocks to height {height}")
+        if depth > self.max_reorg_depth:
+            raise ValueError(f"Rollback depth {depth} exceeds max_reorg_depth {self.max_reorg_depth}")
+
+        removed = []
+        for _ in range(depth):
+            block = self.chain.pop()
+            for address, delta in self._balance_deltas(block).items():
+                self.balances[address] = self.balances.get(address, 0) - delta
+            removed.append(block)
+        self.balance_height = height
+
+        # Re-reserve the mempool against the reverted balances. Transactions that no
+        # longer fit are dropped, and so is the reward for the orphaned tip.
+        pending = self.pending_transactions
+        self.pending_transactions, self.pending_spent = [], {}
+        for transaction in pending:
+            if transaction.sender and self._reserve_funds(transaction):
+                self.pending_transactions.append(transaction)
+        if self.validated_height > height:
+            self.validated_height, self.validated_hash = height, self.chain[height].hash
+        if self.store is not None:
+            self.store.save_checkpoint(self.validated_height, self.validated_hash)
+            self._save_balance_snapshot()
+        return removed
+
     def add_transaction(self, transaction: Transaction) -> bool:
         if not transaction.verify_signature():
             return False
+        if not self._reserve_funds(transaction):
+            return False
         self.pending_transactions.append(transaction)
         return True
 
+    def add_transactions(self, transactions: List[Transaction], workers: Optional[int] = None,
+                         batch_size: int = 256) -> Tuple[List[Transaction], List[Tuple[Transaction, str]]]:
+        # Bulk mempool ingest: signatures are checked in batches across a process pool and
+        # every rejected transaction is reported with a reason instead of stopping the run
+        transactions = list(transactions)
+        batches = [transactions[i:i + batch_size] for i in range(0, len(transactions), batch_size)]
+        if workers == 1 or len(batches) <= 1:
+            results = [verify_transactions(batch) for batch in batches]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(verify_transactions, batches))
+
+        accepted, rejected = [], []
+        for batch, verdicts in zip(batches, results):
+            for transaction, valid in zip(batch, verdicts):
+                if not valid:
+                    rejected.append((transaction, "invalid signature"))
+                elif not self._reserve_funds(transaction):
+                    rejected.append((transaction, "insufficient funds"))
+                else:
+                    self.pending_transactions.append(transaction)
+                    accepted.append(transaction)
+        return accepted, rejected
+
     def mine_pending_transactions(self, miner_address: str):
         block = Block(len(self.chain), self.pending_transactions, self.get_latest_block().hash)
-        block.mine_block(self.difficulty)
+        block.mine_block(self.difficulty, self.mining_workers)
         self.chain.append(block)
+        self._apply_block(block)
         self.pending_transactions = [
             Transaction("", miner_address, self.mining_reward, time.time())
         ]
+        self.pending_spent = {}
 
-    def is_chain_valid(self) -> bool:
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i-1]
+    def is_chain_valid(self, full: bool = False, workers: Optional[int] = 1) -> bool:
+        start = 1
+        checkpoint_intact = (self.validated_height < len(self.chain)
+                             and self.chain[self.validated_height].hash == self.validated_hash)
+        if not full and checkpoint_intact:
+            start = self.validated_height + 1
 
-            if current_block.hash != current_block.calculate_hash():
-                return False
+        if full and workers != 1:
+            valid = self._validate_parallel(workers or os.cpu_count() or 1)
+        else:
+            valid = validate_segment(self.chain[start:], self.chain[start - 1].hash)
 
-            if current_block.previous_hash != previous_block.hash:
-                return False
+        if valid:
+            self.validated_height = len(self.chain) - 1
+            self.validated_hash = self.chain[-1].hash
+            if self.store is not None:
+                self.store.save_checkpoint(self.validated_height, self.validated_hash)
+        return valid
 
-        return True
+    def _validate_parallel(self, workers: int) -> bool:
+        # Segments only depend on the stored hash of the block before them, so they can
+        # be checked independently and the chain is valid when every segment is
+        size = max(1, -(-(len(self.chain) - 1) // workers))
+        starts = range(1, len(self.chain), size)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(validate_segment,
+                                   [self.chain[i:i + size] for i in starts],
+                                   [self.chain[i - 1].hash for i in starts])
+            return all(results)
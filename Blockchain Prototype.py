@@ -1,5 +1,7 @@
 import hashlib
+import os
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 class Block:
     def __init__(self, index, prev_hash, data, nonce=0):
@@ -13,12 +15,101 @@ class Block:
         s = f"{self.index}{self.prev_hash}{self.data}{self.nonce}{self.timestamp}"
         return hashlib.sha256(s.encode()).hexdigest()
 
-def mine(block, difficulty=4):
-    prefix = "0" * difficulty
-    while not block.hash().startswith(prefix):
-        block.nonce += 1
-    return block
+    def hash_parts(self):
+        # hash() without the nonce: the text before it and the text after it
+        return f"{self.index}{self.prev_hash}{self.data}".encode(), f"{self.timestamp}".encode()
 
-genesis = Block(0, "0", "Genesis")
-mined = mine(genesis)
-print("Mined hash:", mined.hash())
+def difficulty_target(difficulty):
+    # hexdigest().startswith("0" * difficulty) <=> digest as an integer is below this
+    return 1 << (256 - 4 * difficulty)
+
+def search_range(prefix, suffix, target, start, stop, deadline=None):
+    # Hashes nonces in [start, stop); returns (nonce or None, hashes done, seconds, pid)
+    began = time.perf_counter()
+    base = hashlib.sha256(prefix)
+    for nonce in range(start, stop):
+        h = base.copy()
+        h.update(str(nonce).encode())
+        h.update(suffix)
+        if int.from_bytes(h.digest(), "big") < target:
+            return nonce, nonce - start + 1, time.perf_counter() - began, os.getpid()
+        if deadline is not None and nonce & 0xFFF == 0 and time.time() > deadline:
+            return None, nonce - start + 1, time.perf_counter() - began, os.getpid()
+    return None, stop - start, time.perf_counter() - began, os.getpid()
+
+class MiningEngine:
+    def __init__(self, workers=None, chunk_size=100_000):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.stats = {}
+
+    def mine(self, block, difficulty=4, time_limit=None):
+        # Returns the block with a winning nonce, or None when time_limit runs out first.
+        # Per-worker hash counts and busy time end up in self.stats, keyed by pid.
+        prefix, suffix = block.hash_parts()
+        target = difficulty_target(difficulty)
+        deadline = time.time() + time_limit if time_limit is not None else None
+        self.stats = {}
+        next_start = block.nonce
+        found = []
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = set()
+            while not found and (deadline is None or time.time() < deadline):
+                while len(in_flight) < 2 * self.workers:
+                    in_flight.add(executor.submit(search_range, prefix, suffix, target,
+                                                  next_start, next_start + self.chunk_size, deadline))
+                    next_start += self.chunk_size
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                found += self._collect(done)
+            for future in in_flight:
+                future.cancel()
+            found += self._collect(f for f in in_flight if not f.cancelled())
+
+        if not found:
+            return None
+        block.nonce = min(found)
+        return block
+
+    def _collect(self, futures):
+        found = []
+        for future in futures:
+            nonce, hashes, seconds, pid = future.result()
+            worker = self.stats.setdefault(pid, {"hashes": 0, "seconds": 0.0})
+            worker["hashes"] += hashes
+            worker["seconds"] += seconds
+            if nonce is not None:
+                found.append(nonce)
+        return found
+
+def mine(block, difficulty=4, workers=1):
+    if workers != 1:
+        return MiningEngine(workers).mine(block, difficulty)
+    prefix, suffix = block.hash_parts()
+    target = difficulty_target(difficulty)
+    while True:
+        nonce = search_range(prefix, suffix, target, block.nonce, block.nonce + 100_000)[0]
+        if nonce is not None:
+            block.nonce = nonce
+            return block
+        block.nonce += 100_000
+
+def benchmark(seconds=5, worker_counts=(1, 2, 4)):
+    # Time-bounded runs against an unreachable target, so every worker hashes the whole time
+    results = {}
+    for workers in worker_counts:
+        engine = MiningEngine(workers)
+        start = time.perf_counter()
+        engine.mine(Block(1, "0", "benchmark"), difficulty=64, time_limit=seconds)
+        elapsed = time.perf_counter() - start
+        total = sum(w["hashes"] for w in engine.stats.values())
+        results[workers] = total / elapsed
+        print(f"{workers} worker(s): {total / elapsed:,.0f} hashes/sec")
+        for pid, w in sorted(engine.stats.items()):
+            print(f"  pid {pid}: {w['hashes']:,} hashes, {w['hashes'] / max(w['seconds'], 1e-9):,.0f} hashes/sec")
+    return results
+
+if __name__ == "__main__":
+    genesis = Block(0, "0", "Genesis")
+    mined = mine(genesis)
+    print("Mined hash:", mined.hash())
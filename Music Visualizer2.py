@@ -2,10 +2,38 @@ import matplotlib.pyplot as plt
 import numpy as np
 import wave
 
+N_FFT = 1024
+HOP = 512
+MAX_COLUMNS = 2000  # frames are max-pooled into this many columns, so memory does not grow with file length
+
 wav = wave.open("song.wav", "r")
-signal = wav.readframes(-1)
-signal = np.frombuffer(signal, dtype=np.int16)
+rate = wav.getframerate()
+channels = wav.getnchannels()
+total_frames = max((wav.getnframes() - N_FFT) // HOP + 1, 1)
+frames_per_column = -(-total_frames // MAX_COLUMNS)
+
+window = np.hanning(N_FFT).astype(np.float32)
+columns = np.zeros((N_FFT // 2 + 1, -(-total_frames // frames_per_column)), dtype=np.float32)
+carry = np.zeros(0, dtype=np.float32)
+frame_index = 0
+
+while True:
+    chunk = wav.readframes(HOP * 256)
+    if not chunk:
+        break
+    samples = np.frombuffer(chunk, dtype=np.int16).reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    buffer = np.concatenate([carry, samples])
+    count = (len(buffer) - N_FFT) // HOP + 1 if len(buffer) >= N_FFT else 0
+    if count:
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, N_FFT)[::HOP][:count]
+        power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2
+        cols = (frame_index + np.arange(count)) // frames_per_column
+        np.maximum.at(columns.T, cols, power)
+        frame_index += count
+    carry = buffer[count * HOP:]
 
-plt.specgram(signal, Fs=wav.getframerate())
+duration = wav.getnframes() / rate
+plt.imshow(10 * np.log10(columns + 1e-10), origin="lower", aspect="auto",
+           extent=(0, duration, 0, rate / 2))
 plt.title("Music Visualizer")
 plt.show()
@@ -1,6 +1,6 @@
 import numpy as np
-from typing import List, Union
-from functools import reduce
+import time
+from typing import List, Optional, Sequence, Tuple, Union
 
 class Qubit:
     def __init__(self, state: np.ndarray = None):
@@ -28,6 +28,24 @@ class QuantumGate:
     def pauli_z():
         return np.array([[1, 0], [0, -1]], dtype=complex)
     
+    # Rotation gates accept a scalar angle or an array of angles; an array of shape
+    # (batch,) yields a stack of matrices of shape (batch, 2, 2).
+    @staticmethod
+    def rx(theta):
+        c, s = np.cos(np.asarray(theta) / 2), np.sin(np.asarray(theta) / 2)
+        return np.stack([np.stack([c, -1j * s], -1), np.stack([-1j * s, c], -1)], -2).astype(complex)
+    
+    @staticmethod
+    def ry(theta):
+        c, s = np.cos(np.asarray(theta) / 2), np.sin(np.asarray(theta) / 2)
+        return np.stack([np.stack([c, -s], -1), np.stack([s, c], -1)], -2).astype(complex)
+    
+    @staticmethod
+    def rz(theta):
+        phase = np.exp(-0.5j * np.asarray(theta))
+        zero = np.zeros_like(phase)
+        return np.stack([np.stack([phase, zero], -1), np.stack([zero, phase.conj()], -1)], -2)
+    
     @staticmethod
     def cnot():
         return np.array([
@@ -46,25 +64,120 @@ class QuantumGate:
             [0, 0, 0, 1]
         ], dtype=complex)
 
+def apply_to_tensor(tensor: np.ndarray, gate: np.ndarray, axes: Sequence[int]) -> np.ndarray:
+    # Contract a k-qubit gate with the given axes of a (..., 2, 2, ..., 2) state tensor.
+    # Only the state itself is touched, so memory stays O(2^n) instead of O(4^n).
+    k = len(axes)
+    gate_tensor = gate.reshape((2,) * (2 * k))
+    result = np.tensordot(gate_tensor, tensor, axes=(list(range(k, 2 * k)), list(axes)))
+    return np.moveaxis(result, list(range(k)), list(axes))
+
+def _is_identity(matrix: np.ndarray) -> bool:
+    return np.allclose(matrix, np.eye(len(matrix)), atol=1e-12)
+
+def fuse_gates(gates: List[Tuple[np.ndarray, List[int]]]) -> List[Tuple[np.ndarray, List[int]]]:
+    # Multiply each gate into the previous gate on exactly the same qubits when nothing
+    # else touched those qubits in between; products equal to identity (H-H, X-X,
+    # CNOT-CNOT, ...) are dropped, which may expose further pairs underneath.
+    ops = []
+    last_on_qubit = {}  # qubit -> stack of indices into ops touching it
+    
+    for gate, qubits in gates:
+        qubits = list(qubits)
+        stacks = [last_on_qubit.setdefault(q, []) for q in qubits]
+        previous = stacks[0][-1] if stacks[0] else None
+        if (previous is not None and ops[previous] is not None
+                and ops[previous][1] == qubits and all(s and s[-1] == previous for s in stacks)):
+            fused = gate @ ops[previous][0]
+            if _is_identity(fused):
+                ops[previous] = None
+                for stack in stacks:
+                    stack.pop()
+            else:
+                ops[previous] = (fused, qubits)
+            continue
+        
+        ops.append((gate, qubits))
+        for stack in stacks:
+            stack.append(len(ops) - 1)
+    
+    return [op for op in ops if op is not None]
+
+def batch_gates(ops: List[Tuple[np.ndarray, List[int]]], max_block_qubits: int = 3) -> List[Tuple[np.ndarray, List[int]]]:
+    # ASAP layering: a gate lands one layer after the latest gate sharing a qubit with it.
+    layers = []
+    depth = {}
+    for gate, qubits in ops:
+        layer = 1 + max((depth.get(q, -1) for q in qubits), default=-1)
+        for q in qubits:
+            depth[q] = layer
+        if layer == len(layers):
+            layers.append([])
+        layers[layer].append((gate, qubits))
+    
+    # Gates in one layer act on disjoint qubits, so their Kronecker product is a single
+    # gate on the union; one contraction then replaces several passes over the state.
+    batched = []
+    for layer in layers:
+        block_gate, block_qubits = None, []
+        for gate, qubits in sorted(layer, key=lambda op: len(op[1])):
+            if block_gate is not None and len(block_qubits) + len(qubits) <= max_block_qubits:
+                block_gate = np.kron(block_gate, gate)
+                block_qubits = block_qubits + qubits
+                continue
+            if block_gate is not None:
+                batched.append((block_gate, block_qubits))
+            block_gate, block_qubits = gate, list(qubits)
+        if block_gate is not None:
+            batched.append((block_gate, block_qubits))
+    return batched
+
+def compile_gates(gates: List[Tuple[np.ndarray, List[int]]], max_block_qubits: int = 3) -> List[Tuple[np.ndarray, List[int]]]:
+    return batch_gates(fuse_gates(gates), max_block_qubits)
+
 class QuantumCircuit:
-    def __init__(self, num_qubits: int):
+    def __init__(self, num_qubits: int, dtype=complex, deferred: bool = False):
         self.num_qubits = num_qubits
-        self.state = np.zeros(2 ** num_qubits, dtype=complex)
+        self.dtype = dtype  # np.complex64 halves memory for very wide circuits
+        self.state = np.zeros(2 ** num_qubits, dtype=dtype)
         self.state[0] = 1  # Initialize to |0...0⟩
         self.gates = []
+        # In deferred mode gates are only recorded; they are compiled and applied on
+        # the next execute(), which every read of the state triggers.
+        self.deferred = deferred
+        self.pending = []
+    
+    def _check_qubits(self, gate: np.ndarray, qubits: List[int]):
+        if len(set(qubits)) != len(qubits):
+            raise ValueError(f"Gate qubits must be distinct, got {qubits}")
+        if any(not 0 <= q < self.num_qubits for q in qubits):
+            raise ValueError(f"Qubit index out of range for {self.num_qubits} qubits: {qubits}")
+        if gate.shape != (2 ** len(qubits), 2 ** len(qubits)):
+            raise ValueError(f"A {gate.shape} gate cannot act on {len(qubits)} qubit(s)")
     
     def apply_gate(self, gate: np.ndarray, qubits: List[int]):
-        # Create full operator matrix
-        identity = np.eye(2, dtype=complex)
-        operators = [identity] * self.num_qubits
-        
-        for i, qubit in enumerate(qubits):
-            operators[qubit] = gate if i == 0 else identity
-        
-        full_operator = reduce(np.kron, operators)
-        self.state = full_operator.dot(self.state)
+        # Qubit 0 is the most significant bit, i.e. the first axis of the state tensor
+        self._check_qubits(gate, qubits)
+        if self.deferred:
+            self.pending.append((gate, list(qubits)))
+        else:
+            self.state = self._apply_ops(self.state, [(gate, qubits)])
         self.gates.append((gate, qubits))
     
+    def _apply_ops(self, state: np.ndarray, ops: List[Tuple[np.ndarray, List[int]]]) -> np.ndarray:
+        tensor = state.reshape((2,) * self.num_qubits)
+        for gate, qubits in ops:
+            tensor = apply_to_tensor(tensor, gate.astype(self.dtype, copy=False), qubits)
+        return np.ascontiguousarray(tensor).reshape(-1)
+    
+    def compile(self, max_block_qubits: int = 3) -> List[Tuple[np.ndarray, List[int]]]:
+        return compile_gates(self.pending, max_block_qubits)
+    
+    def execute(self, max_block_qubits: int = 3):
+        if self.pending:
+            self.state = self._apply_ops(self.state, self.compile(max_block_qubits))
+            self.pending = []
+    
     def hadamard(self, qubit: int):
         self.apply_gate(QuantumGate.hadamard(), [qubit])
     
@@ -77,30 +190,146 @@ class QuantumCircuit:
     def swap(self, qubit1: int, qubit2: int):
         self.apply_gate(QuantumGate.swap(), [qubit1, qubit2])
     
-    def measure_all(self) -> List[int]:
-        probabilities = np.abs(self.state) ** 2
-        outcome = np.random.choice(len(self.state), p=probabilities)
+    def rx(self, qubit: int, theta: float):
+        self.apply_gate(QuantumGate.rx(theta), [qubit])
+    
+    def ry(self, qubit: int, theta: float):
+        self.apply_gate(QuantumGate.ry(theta), [qubit])
+    
+    def rz(self, qubit: int, theta: float):
+        self.apply_gate(QuantumGate.rz(theta), [qubit])
+    
+    def measure_all(self, rng: Optional[Union[int, np.random.Generator]] = None) -> List[int]:
+        self.execute()
+        rng = np.random.default_rng(rng)
+        outcome = rng.choice(len(self.state), p=self.get_probabilities())
         return [int(bit) for bit in format(outcome, f'0{self.num_qubits}b')]
     
     def get_statevector(self) -> np.ndarray:
+        self.execute()
         return self.state
     
     def get_probabilities(self) -> np.ndarray:
-        return np.abs(self.state) ** 2
+        self.execute()
+        probabilities = np.abs(self.state).astype(float) ** 2
+        return probabilities / probabilities.sum()  # absorb rounding drift before sampling
     
-    def run(self, shots: int = 1024) -> dict:
-        results = {}
-        probabilities = self.get_probabilities()
+    def run(self, shots: int = 1024, rng: Optional[Union[int, np.random.Generator]] = None) -> dict:
+        # Pass a seed or np.random.Generator for reproducible counts
+        rng = np.random.default_rng(rng)
+        outcomes = rng.choice(len(self.state), size=shots, p=self.get_probabilities())
+        counts = np.bincount(outcomes)
+        observed = np.flatnonzero(counts)
         
-        for _ in range(shots):
-            outcome = np.random.choice(len(self.state), p=probabilities)
-            binary = format(outcome, f'0{self.num_qubits}b')
-            results[binary] = results.get(binary, 0) + 1
+        return {format(int(outcome), f'0{self.num_qubits}b'): int(counts[outcome]) / shots
+                for outcome in observed}
+
+class BatchedQuantumCircuit:
+    # Evolves a (batch, 2^n) stack of state vectors through one circuit structure.
+    # Fixed gates are shared by the whole batch; rotation gates take one angle per
+    # batch entry, so a parameter sweep is a single vectorised pass.
+    def __init__(self, num_qubits: int, batch_size: int, dtype=complex):
+        self.num_qubits = num_qubits
+        self.batch_size = batch_size
+        self.dtype = dtype
+        self.state = np.zeros((batch_size, 2 ** num_qubits), dtype=dtype)
+        self.state[:, 0] = 1
+        self.gates = []
+    
+    def _tensor(self) -> np.ndarray:
+        return self.state.reshape((self.batch_size,) + (2,) * self.num_qubits)
+    
+    def apply_gate(self, gate: np.ndarray, qubits: List[int]):
+        gate = np.asarray(gate)
+        dim = 2 ** len(qubits)
+        if len(set(qubits)) != len(qubits) or any(not 0 <= q < self.num_qubits for q in qubits):
+            raise ValueError(f"Invalid qubits {qubits} for {self.num_qubits} qubits")
+        if gate.shape not in ((dim, dim), (self.batch_size, dim, dim)):
+            raise ValueError(f"Expected a {(dim, dim)} or {(self.batch_size, dim, dim)} gate, got {gate.shape}")
         
-        return {k: v / shots for k, v in results.items()}
+        axes = [q + 1 for q in qubits]  # axis 0 is the batch
+        if gate.ndim == 2:
+            tensor = apply_to_tensor(self._tensor(), gate.astype(self.dtype, copy=False), axes)
+        else:
+            # Per-batch matrices: bring the target axes next to the batch axis and use a
+            # batched matmul over the flattened remainder.
+            k = len(qubits)
+            moved = np.moveaxis(self._tensor(), axes, list(range(1, k + 1)))
+            shape = moved.shape
+            result = np.matmul(gate.astype(self.dtype, copy=False), moved.reshape(self.batch_size, dim, -1))
+            tensor = np.moveaxis(result.reshape(shape), list(range(1, k + 1)), axes)
+        self.state = np.ascontiguousarray(tensor).reshape(self.batch_size, -1)
+        self.gates.append((gate, qubits))
+    
+    def hadamard(self, qubit: int):
+        self.apply_gate(QuantumGate.hadamard(), [qubit])
+    
+    def pauli_x(self, qubit: int):
+        self.apply_gate(QuantumGate.pauli_x(), [qubit])
+    
+    def cnot(self, control: int, target: int):
+        self.apply_gate(QuantumGate.cnot(), [control, target])
+    
+    def swap(self, qubit1: int, qubit2: int):
+        self.apply_gate(QuantumGate.swap(), [qubit1, qubit2])
+    
+    # A scalar angle gives one shared matrix, an array gives one per batch entry
+    def rx(self, qubit: int, thetas):
+        self.apply_gate(QuantumGate.rx(thetas), [qubit])
+    
+    def ry(self, qubit: int, thetas):
+        self.apply_gate(QuantumGate.ry(thetas), [qubit])
+    
+    def rz(self, qubit: int, thetas):
+        self.apply_gate(QuantumGate.rz(thetas), [qubit])
+    
+    def get_statevector(self) -> np.ndarray:
+        return self.state
+    
+    def get_probabilities(self) -> np.ndarray:
+        probabilities = np.abs(self.state).astype(float) ** 2
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+    
+    def expectation_z(self, qubit: int) -> np.ndarray:
+        # <Z> on one qubit for every batch entry, shape (batch,)
+        probabilities = self.get_probabilities().reshape((self.batch_size,) + (2,) * self.num_qubits)
+        marginal = np.moveaxis(probabilities, qubit + 1, 1).reshape(self.batch_size, 2, -1).sum(axis=2)
+        return marginal[:, 0] - marginal[:, 1]
+
+def benchmark_compilation(circuit: QuantumCircuit, max_block_qubits: int = 3) -> dict:
+    # Replays the recorded gates from |0...0⟩ once as-is and once compiled
+    initial = np.zeros(2 ** circuit.num_qubits, dtype=circuit.dtype)
+    initial[0] = 1
+    
+    start = time.perf_counter()
+    raw_state = circuit._apply_ops(initial, circuit.gates)
+    raw_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    compiled = compile_gates(circuit.gates, max_block_qubits)
+    compiled_state = circuit._apply_ops(initial, compiled)
+    compiled_time = time.perf_counter() - start
+    
+    report = {
+        "gates_before": len(circuit.gates),
+        "gates_after": len(compiled),
+        "time_before": raw_time,
+        "time_after": compiled_time,
+        "max_deviation": float(np.max(np.abs(raw_state - compiled_state))),
+    }
+    print(f"Gates: {report['gates_before']} -> {report['gates_after']}, "
+          f"runtime: {raw_time * 1000:.2f} ms -> {compiled_time * 1000:.2f} ms")
+    return report
 
 # Example: Bell state creation
 circuit = QuantumCircuit(2)
 circuit.hadamard(0)
 circuit.cnot(0, 1)
 print("Bell state probabilities:", circuit.run(shots=1000))
+
+# Example: sweep an RY angle over 5 values in one batched pass
+thetas = np.linspace(0, np.pi, 5)
+sweep = BatchedQuantumCircuit(2, batch_size=len(thetas))
+sweep.ry(0, thetas)
+sweep.cnot(0, 1)
+print("<Z1> over the sweep:", np.round(sweep.expectation_z(1), 3))
@@ -1,61 +1,258 @@
 import pyaudio
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy import fft as sp_fft
 from scipy import signal
-from typing import Callable, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import os
+import struct
 import threading
 import time
+import wave
+
+class RingBuffer:
+    # Single-producer/single-consumer ring over a preallocated array. Only the writer
+    # advances write_pos and only the reader advances read_pos, each after its copy is
+    # done, so the audio callback and the worker thread never need a lock.
+    def __init__(self, capacity: int, dtype=np.float32):
+        self.buffer = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self.write_pos = 0
+        self.read_pos = 0
+    
+    def available(self) -> int:
+        return self.write_pos - self.read_pos
+    
+    def write(self, data: np.ndarray) -> bool:
+        n = len(data)
+        if n > self.capacity - self.available():
+            return False
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = data[:first]
+        self.buffer[:n - first] = data[first:]
+        self.write_pos += n
+        return True
+    
+    def read_into(self, out: np.ndarray) -> bool:
+        n = len(out)
+        if n > self.available():
+            return False
+        start = self.read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.buffer[start:start + first]
+        out[first:] = self.buffer[:n - first]
+        self.read_pos += n
+        return True
+    
+    def skip(self, n: int) -> int:
+        # Reader-side discard of up to n samples; returns how many were dropped
+        n = min(n, self.available())
+        self.read_pos += n
+        return n
 
 class RealTimeAudioProcessor:
     def __init__(self, sample_rate: int = 44100, chunk_size: int = 1024):
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
-        self.audio = pyaudio.PyAudio()
+        self._audio = None
         self.is_recording = False
         self.processors: List[Callable] = []
+        # Names given to add_processor, keyed by id() and holding the processor so a
+        # recycled id can never pick up a stale name
+        self._names: Dict[int, Tuple[Callable, str]] = {}
+        # When enabled, apply_processors times every processor against the chunk period
+        self.monitor_timing = False
+        self.timing_stats: Dict[str, Dict[str, float]] = {}
+        # Glitch counters for offloaded recording, see start_recording(offload=True)
+        self.xruns = 0
+        self.overruns = 0
+        self.stream_errors = 0
         
-    def add_processor(self, processor: Callable):
+    @property
+    def audio(self) -> pyaudio.PyAudio:
+        # PortAudio is only initialised once a live stream is needed, so offline
+        # processing works on machines without audio hardware
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+        return self._audio
+    
+    def _processor_name(self, processor: Callable) -> str:
+        entry = self._names.get(id(processor))
+        if entry is not None and entry[0] is processor:
+            return entry[1]
+        # Factories that build several variants tag their closure with processor_name;
+        # other closures are all called "processor", so use the factory name. partials
+        # and callable instances have no __qualname__, so fall back to their type.
+        if getattr(processor, "processor_name", None):
+            return processor.processor_name
+        qualname = getattr(processor, "__qualname__", type(processor).__name__)
+        return qualname.split('.<locals>')[0].split('.')[-1]
+    
+    @property
+    def processor_names(self) -> List[str]:
+        # Prefixed with the chain position, so repeated processors get separate timings
+        return [f"{index}:{self._processor_name(processor)}" for index, processor in enumerate(self.processors)]
+    
+    def add_processor(self, processor: Callable, name: Optional[str] = None):
+        if name is not None:
+            self._names[id(processor)] = (processor, name)
         self.processors.append(processor)
     
-    def apply_processors(self, audio_data: np.ndarray) -> np.ndarray:
-        processed = audio_data.copy()
-        for processor in self.processors:
+    def apply_processors(self, audio_data: np.ndarray, copy: bool = True) -> np.ndarray:
+        # copy=False lets a caller that owns a scratch buffer skip the defensive copy
+        processed = audio_data.copy() if copy else audio_data
+        if not self.monitor_timing:
+            for processor in self.processors:
+                processed = processor(processed)
+            return processed
+        
+        period = len(audio_data) / self.sample_rate
+        chain_start = time.perf_counter()
+        for index, processor in enumerate(self.processors):
+            name = f"{index}:{self._processor_name(processor)}"
+            start = time.perf_counter()
             processed = processor(processed)
+            self._record_timing(name, time.perf_counter() - start, period)
+        self._record_timing("chain", time.perf_counter() - chain_start, period)
         return processed
     
-    def low_pass_filter(self, cutoff: float = 4000):
+    def _record_timing(self, name: str, elapsed: float, period: float):
+        stats = self.timing_stats.setdefault(name, {"calls": 0, "total": 0.0, "max_load": 0.0, "overruns": 0})
+        load = elapsed / period
+        stats["calls"] += 1
+        stats["total"] += load
+        stats["max_load"] = max(stats["max_load"], load)
+        stats["overruns"] += load >= 1.0
+    
+    def timing_report(self) -> Dict[str, Dict[str, float]]:
+        # Share of the chunk period (1.0 = the whole budget) used per processor and chain
+        report = {}
+        for name, stats in self.timing_stats.items():
+            report[name] = {
+                "mean_load": stats["total"] / stats["calls"],
+                "max_load": stats["max_load"],
+                "overruns": stats["overruns"],
+            }
+            print(f"{name:>24}: mean {report[name]['mean_load']:6.1%}  max {stats['max_load']:6.1%}  "
+                  f"over budget {stats['overruns']}x")
+        return report
+    
+    def envelope_follower(self, attack: float, release: float,
+                          floor_db: float = -np.inf) -> Callable[[np.ndarray], np.ndarray]:
+        # Peak level in dB with exponential release, then one-pole attack smoothing.
+        # In dB an exponential release is a straight line, so "hold the peak and decay"
+        # becomes a running maximum of level - n*slope, which vectorises exactly.
+        # The level is clamped to floor_db before smoothing: dynamics processors pass their
+        # threshold, so the attack ramps the over-threshold part from 0 dB rather than
+        # climbing up from the silence floor. State carries across chunks.
+        release_slope = 20 / np.log(10) / (release * self.sample_rate) if release > 0 else np.inf
+        attack_coef = np.exp(-1 / (attack * self.sample_rate)) if attack > 0 else 0.0
+        state = {"peak": -np.inf, "smoothed": None}
+        
+        def follow(audio_data: np.ndarray) -> np.ndarray:
+            level = 20 * np.log10(np.abs(audio_data) + 1e-12)
+            if np.isfinite(release_slope):
+                ramp = release_slope * np.arange(1, len(level) + 1)
+                held = np.maximum.accumulate(np.maximum(level + ramp, state["peak"]))
+                peak = held - ramp
+            else:
+                peak = level
+            state["peak"] = peak[-1] if len(peak) else state["peak"]
+            peak = np.maximum(peak, floor_db)
+            
+            if not attack_coef:
+                return peak
+            if state["smoothed"] is None:
+                state["smoothed"] = floor_db if np.isfinite(floor_db) else (peak[0] if len(peak) else 0.0)
+            smoothed, zi = signal.lfilter([1 - attack_coef], [1, -attack_coef], peak,
+                                          zi=[attack_coef * state["smoothed"]])
+            state["smoothed"] = smoothed[-1] if len(smoothed) else state["smoothed"]
+            return smoothed
+        return follow
+    
+    def streaming_filter(self, sos: np.ndarray, name: str = "streaming_filter") -> Callable[[np.ndarray], np.ndarray]:
+        # Causal second-order-section filter whose state (zi) carries from one chunk to
+        # the next, so consecutive chunks are filtered as one continuous signal
+        state = {"zi": None}
+        
         def processor(audio_data: np.ndarray) -> np.ndarray:
-            nyquist = 0.5 * self.sample_rate
-            normal_cutoff = cutoff / nyquist
-            b, a = signal.butter(4, normal_cutoff, btype='low', analog=False)
-            return signal.filtfilt(b, a, audio_data)
+            if state["zi"] is None:
+                # Start from steady state at the first sample to avoid a start-up click
+                first = audio_data[0] if len(audio_data) else 0.0
+                state["zi"] = signal.sosfilt_zi(sos) * first
+            filtered, state["zi"] = signal.sosfilt(sos, audio_data, zi=state["zi"])
+            return filtered.astype(audio_data.dtype, copy=False)
+        processor.processor_name = name
         return processor
     
+    def low_pass_filter(self, cutoff: float = 4000):
+        nyquist = 0.5 * self.sample_rate
+        sos = signal.butter(4, cutoff / nyquist, btype='low', output='sos')
+        return self.streaming_filter(sos, f"low_pass_filter({cutoff:g})")
+    
     def high_pass_filter(self, cutoff: float = 200):
+        nyquist = 0.5 * self.sample_rate
+        sos = signal.butter(4, cutoff / nyquist, btype='high', output='sos')
+        return self.streaming_filter(sos, f"high_pass_filter({cutoff:g})")
+    
+    def compressor(self, threshold: float = 0.5, ratio: float = 4.0, attack: float = 0.005, release: float = 0.05):
+        # threshold is a linear amplitude; attack/release are in seconds (0 = instant)
+        threshold_db = 20 * np.log10(threshold)
+        envelope = self.envelope_follower(attack, release, floor_db=threshold_db)
+        
+        def processor(audio_data: np.ndarray) -> np.ndarray:
+            over = envelope(audio_data) - threshold_db
+            gain = 10 ** (-over * (1 - 1 / ratio) / 20)
+            return audio_data * gain.astype(audio_data.dtype, copy=False)
+        return processor
+    
+    def limiter(self, threshold: float = 0.9, attack: float = 0.0, release: float = 0.05):
+        # A compressor with infinite ratio. With the default attack=0 the output never
+        # exceeds the threshold; a non-zero attack lets transients overshoot for about
+        # that long in exchange for less distortion.
+        threshold_db = 20 * np.log10(threshold)
+        envelope = self.envelope_follower(attack, release, floor_db=threshold_db)
+        
         def processor(audio_data: np.ndarray) -> np.ndarray:
-            nyquist = 0.5 * self.sample_rate
-            normal_cutoff = cutoff / nyquist
-            b, a = signal.butter(4, normal_cutoff, btype='high', analog=False)
-            return signal.filtfilt(b, a, audio_data)
+            over = envelope(audio_data) - threshold_db
+            return audio_data * (10 ** (-over / 20)).astype(audio_data.dtype, copy=False)
         return processor
     
-    def compressor(self, threshold: float = 0.5, ratio: float = 4.0):
+    def noise_gate(self, threshold: float = 0.02, attack: float = 0.001, release: float = 0.1,
+                   floor_db: float = -80.0):
+        # The detector holds the level for `release` so the gate does not chatter; the gain
+        # then opens and closes with a one-pole ramp of length `attack`
+        threshold_db = 20 * np.log10(threshold)
+        envelope = self.envelope_follower(0, release)
+        ramp_coef = np.exp(-1 / (attack * self.sample_rate)) if attack > 0 else 0.0
+        state = {"gain": 0.0}
+        
         def processor(audio_data: np.ndarray) -> np.ndarray:
-            compressed = np.zeros_like(audio_data)
-            for i in range(len(audio_data)):
-                if abs(audio_data[i]) > threshold:
-                    compressed[i] = threshold + (audio_data[i] - threshold) / ratio
-                else:
-                    compressed[i] = audio_data[i]
-            return compressed
+            target = np.where(envelope(audio_data) >= threshold_db, 0.0, floor_db)
+            gain_db, _ = signal.lfilter([1 - ramp_coef], [1, -ramp_coef], target,
+                                        zi=[ramp_coef * state["gain"]])
+            if len(gain_db):
+                state["gain"] = gain_db[-1]
+            return audio_data * (10 ** (gain_db / 20)).astype(audio_data.dtype, copy=False)
         return processor
     
-    def fft_analysis(self, audio_data: np.ndarray) -> tuple:
-        fft = np.fft.fft(audio_data)
-        freqs = np.fft.fftfreq(len(audio_data), 1/self.sample_rate)
-        return freqs[:len(freqs)//2], np.abs(fft[:len(fft)//2])
+    def fft_analysis(self, audio_data: np.ndarray, window: Optional[str] = None) -> tuple:
+        # Real input only needs the non-negative half of the spectrum
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        if window is not None:
+            audio_data = audio_data * get_window(window, len(audio_data))
+        return rfft_frequencies(len(audio_data), self.sample_rate), np.abs(sp_fft.rfft(audio_data))
+    
+    def stft(self, n_fft: int = 2048, hop_size: int = 512, window: str = "hann") -> "StreamingSTFT":
+        return StreamingSTFT(n_fft, hop_size, window, self.sample_rate)
     
-    def start_recording(self, callback: Callable = None):
+    def start_recording(self, callback: Callable = None, offload: bool = False, latency_chunks: int = 2):
+        # With offload=True the PortAudio callback only moves samples in and out of ring
+        # buffers; a worker thread runs the processors and the user callback. Output lags
+        # input by a fixed latency_chunks * chunk_size samples.
         def audio_callback(in_data, frame_count, time_info, status):
             audio_array = np.frombuffer(in_data, dtype=np.float32)
             processed = self.apply_processors(audio_array)
@@ -65,6 +262,9 @@ class RealTimeAudioProcessor:
             
             return (processed.astype(np.float32).tobytes(), pyaudio.paContinue)
         
+        if offload:
+            audio_callback = self._start_offload(callback, latency_chunks)
+        
         self.stream = self.audio.open(
             format=pyaudio.paFloat32,
             channels=1,
@@ -78,11 +278,64 @@ class RealTimeAudioProcessor:
         self.is_recording = True
         self.stream.start_stream()
     
+    def _start_offload(self, callback: Optional[Callable], latency_chunks: int) -> Callable:
+        capacity = self.chunk_size * (latency_chunks + 8)
+        self.input_ring = RingBuffer(capacity)
+        self.output_ring = RingBuffer(capacity)
+        self.output_ring.write(np.zeros(self.chunk_size * latency_chunks, dtype=np.float32))
+        self.xruns = 0          # callback found no processed audio ready and played silence
+        self.overruns = 0       # worker fell behind and incoming audio had to be dropped
+        self.stream_errors = 0  # PortAudio reported an input/output under- or overflow
+        out_chunk = np.zeros(self.chunk_size, dtype=np.float32)
+        target = self.chunk_size * latency_chunks
+        # Samples replaced by silence in an xrun. Their processed audio still arrives, one
+        # slot late, so that much is dropped again once it is queued to restore the latency.
+        state = {"late": 0}
+        
+        def audio_callback(in_data, frame_count, time_info, status):
+            if status:
+                self.stream_errors += 1
+            if not self.input_ring.write(np.frombuffer(in_data, dtype=np.float32)):
+                self.overruns += 1
+            if not self.output_ring.read_into(out_chunk[:frame_count]):
+                self.xruns += 1
+                out_chunk[:frame_count] = 0
+                state["late"] += frame_count
+            elif state["late"]:
+                excess = self.output_ring.available() - (target - frame_count)
+                if excess > 0:
+                    state["late"] -= self.output_ring.skip(min(excess, state["late"]))
+            return (out_chunk[:frame_count].tobytes(), pyaudio.paContinue)
+        
+        self._worker_running = True
+        self._worker = threading.Thread(target=self._process_worker, args=(callback,), daemon=True)
+        self._worker.start()
+        return audio_callback
+    
+    def _process_worker(self, callback: Optional[Callable]):
+        # The callback side only copies between preallocated rings. The worker reuses one
+        # input buffer, but the processors themselves may still allocate per chunk.
+        work = np.zeros(self.chunk_size, dtype=np.float32)
+        idle = self.chunk_size / self.sample_rate / 4
+        while self._worker_running:
+            if not self.input_ring.read_into(work):
+                time.sleep(idle)
+                continue
+            processed = self.apply_processors(work, copy=False)
+            if callback:
+                callback(processed)
+            if not self.output_ring.write(processed):
+                self.overruns += 1
+    
     def stop_recording(self):
         if self.is_recording:
             self.stream.stop_stream()
             self.stream.close()
             self.is_recording = False
+        if getattr(self, "_worker", None) is not None:
+            self._worker_running = False
+            self._worker.join()
+            self._worker = None
     
     def visualize_audio(self, audio_data: np.ndarray):
         plt.figure(figsize=(12, 8))
@@ -106,19 +359,228 @@ class RealTimeAudioProcessor:
         plt.tight_layout()
         plt.show()
 
-# Example usage
-processor = RealTimeAudioProcessor()
-processor.add_processor(processor.low_pass_filter(3000))
-processor.add_processor(processor.compressor(0.3, 3.0))
+def read_wav_memmap(path: str) -> Tuple[np.ndarray, int]:
+    # Maps the PCM data chunk of a WAV file as a read-only (frames, channels) array.
+    # 24-bit PCM has no numpy dtype, so it is mapped as (frames, channels, 3) raw bytes
+    # and sign-extended block by block in to_float_mono.
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path} is not a WAV file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} has no data chunk")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = f.read(size)
+            elif chunk_id == b"data":
+                data_offset, data_size = f.tell(), size
+                break
+            else:
+                f.seek(size, os.SEEK_CUR)
+            if size % 2:
+                f.seek(1, os.SEEK_CUR)
+    if fmt is None:
+        raise ValueError(f"{path} has no fmt chunk")
+    
+    format_tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if format_tag == 0xFFFE:  # WAVE_FORMAT_EXTENSIBLE: the real tag starts the sub-format GUID
+        format_tag = struct.unpack("<H", fmt[24:26])[0]
+    dtypes = {(1, 8): np.uint8, (1, 16): np.int16, (1, 24): np.uint8, (1, 32): np.int32,
+              (3, 32): np.float32, (3, 64): np.float64}
+    if (format_tag, bits) not in dtypes:
+        raise ValueError(f"Unsupported WAV encoding: format {format_tag}, {bits} bits")
+    dtype = np.dtype(dtypes[(format_tag, bits)]).newbyteorder("<")
+    frame_shape = (channels, 3) if bits == 24 else (channels,)
+    # Truncated files and streamed WAVs (size 0xFFFFFFFF) declare more data than exists
+    data_size = min(data_size, os.path.getsize(path) - data_offset)
+    frames = data_size // (bits // 8 * channels)
+    if frames == 0:
+        return np.zeros((0,) + frame_shape, dtype=dtype), sample_rate
+    data = np.memmap(path, dtype=dtype, mode="r", offset=data_offset, shape=(frames,) + frame_shape)
+    return data, sample_rate
+
+def to_float_mono(block: np.ndarray) -> np.ndarray:
+    # The processors are single-channel, so multi-channel blocks are averaged to mono
+    if block.ndim == 3:  # 24-bit little-endian bytes from read_wav_memmap
+        raw = block.astype(np.int32)
+        value = raw[..., 0] | (raw[..., 1] << 8) | (raw[..., 2] << 16)
+        samples = ((value ^ 0x800000) - 0x800000).astype(np.float32) / 0x7FFFFF
+    elif block.dtype == np.uint8:
+        samples = (block.astype(np.float32) - 128) / 128
+    elif block.dtype.kind == "i":
+        samples = block.astype(np.float32) / np.iinfo(block.dtype).max
+    else:
+        samples = block.astype(np.float32)
+    return samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+
+def iter_wav_chunks(path: str, chunk_frames: int = 65536) -> Iterator[np.ndarray]:
+    # Yields mono float32 blocks; only the pages of the current block are resident
+    data, _ = read_wav_memmap(path)
+    for offset in range(0, len(data), chunk_frames):
+        yield to_float_mono(data[offset:offset + chunk_frames])
+
+@lru_cache(maxsize=32)
+def get_window(name: str, n_fft: int) -> np.ndarray:
+    window = signal.get_window(name, n_fft).astype(np.float32)
+    window.flags.writeable = False
+    return window
+
+@lru_cache(maxsize=32)
+def rfft_frequencies(n_fft: int, sample_rate: int) -> np.ndarray:
+    freqs = sp_fft.rfftfreq(n_fft, 1 / sample_rate)
+    freqs.flags.writeable = False
+    return freqs
+
+class StreamingSTFT:
+    # Short-time Fourier transform over an unbounded stream. Samples that do not yet fill
+    # a whole frame are carried into the next call, so feeding a signal in arbitrary
+    # chunks gives the same frames as transforming it in one piece. scipy.fft keeps its
+    # own plan cache, and windows/bin frequencies are shared between instances.
+    def __init__(self, n_fft: int = 2048, hop_size: int = 512, window: str = "hann", sample_rate: int = 44100):
+        if not 0 < hop_size <= n_fft:
+            raise ValueError("hop_size must be between 1 and n_fft")
+        self.n_fft = n_fft
+        self.hop_size = hop_size
+        self.sample_rate = sample_rate
+        self.window = get_window(window, n_fft)
+        self.frames_emitted = 0
+        self._carry = np.zeros(0, dtype=np.float32)
+    
+    @property
+    def frequencies(self) -> np.ndarray:
+        return rfft_frequencies(self.n_fft, self.sample_rate)
+    
+    def frame_times(self, start: int, count: int) -> np.ndarray:
+        return (start + np.arange(count)) * self.hop_size / self.sample_rate
+    
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        # Returns the magnitude frames completed by this chunk, shape (frames, n_fft // 2 + 1)
+        buffer = np.concatenate([self._carry, np.asarray(chunk, dtype=np.float32)])
+        count = (len(buffer) - self.n_fft) // self.hop_size + 1 if len(buffer) >= self.n_fft else 0
+        if count == 0:
+            self._carry = buffer
+            return np.zeros((0, self.n_fft // 2 + 1), dtype=np.float32)
+        
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, self.n_fft)[::self.hop_size][:count]
+        magnitudes = np.abs(sp_fft.rfft(frames * self.window, axis=1))
+        self._carry = buffer[count * self.hop_size:].copy()
+        self.frames_emitted += count
+        return magnitudes
+    
+    def flush(self) -> np.ndarray:
+        # Zero-pads the tail so every remaining sample lands in at least one frame
+        covered = self.n_fft - self.hop_size if self.frames_emitted else 0
+        if len(self._carry) <= covered:
+            frames = np.zeros((0, self.n_fft // 2 + 1), dtype=np.float32)
+        else:
+            # process() always leaves fewer than n_fft samples behind, so one frame finishes the stream
+            frames = self.process(np.zeros(self.n_fft - len(self._carry), dtype=np.float32))
+        self._carry = np.zeros(0, dtype=np.float32)
+        return frames
+    
+    def reset(self):
+        self.frames_emitted = 0
+        self._carry = np.zeros(0, dtype=np.float32)
+
+def spectrogram_frames(path: str, n_fft: int = 2048, hop_size: int = 512, window: str = "hann",
+                       chunk_frames: int = 65536) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    # Yields (frame_times, magnitudes) blocks for a WAV file in constant memory
+    _, sample_rate = read_wav_memmap(path)
+    stft = StreamingSTFT(n_fft, hop_size, window, sample_rate)
+    for chunk in iter_wav_chunks(path, chunk_frames):
+        start = stft.frames_emitted
+        magnitudes = stft.process(chunk)
+        if len(magnitudes):
+            yield stft.frame_times(start, len(magnitudes)), magnitudes
+    start = stft.frames_emitted
+    magnitudes = stft.flush()
+    if len(magnitudes):
+        yield stft.frame_times(start, len(magnitudes)), magnitudes
+
+class OfflineAudioEngine:
+    # Runs a processor chain over WAV files instead of a live stream. build_chain receives
+    # a fresh RealTimeAudioProcessor and adds processors to it; it must be a module-level
+    # function so it can be sent to worker processes.
+    def __init__(self, build_chain: Callable[[RealTimeAudioProcessor], None], block_size: int = 65536):
+        self.build_chain = build_chain
+        self.block_size = block_size
+    
+    def process_file(self, input_path: str, output_path: Optional[str] = None) -> Dict[str, float]:
+        data, sample_rate = read_wav_memmap(input_path)
+        processor = RealTimeAudioProcessor(sample_rate=sample_rate, chunk_size=self.block_size)
+        self.build_chain(processor)
+        
+        writer = None
+        if output_path is not None:
+            writer = wave.open(output_path, "wb")
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(sample_rate)
+        
+        start = time.perf_counter()
+        peak = 0.0
+        try:
+            for offset in range(0, len(data), self.block_size):
+                block = to_float_mono(data[offset:offset + self.block_size])
+                processed = processor.apply_processors(block, copy=False)
+                peak = max(peak, float(np.max(np.abs(processed), initial=0.0)))
+                if writer is not None:
+                    writer.writeframes((np.clip(processed, -1, 1) * 32767).astype("<i2").tobytes())
+        finally:
+            if writer is not None:
+                writer.close()
+        elapsed = time.perf_counter() - start
+        
+        duration = len(data) / sample_rate
+        return {
+            "file": input_path,
+            "seconds": duration,
+            "processing_time": elapsed,
+            "realtime_factor": duration / elapsed if elapsed else float("inf"),
+            "peak": peak,
+        }
+    
+    def process_files(self, input_paths: List[str], output_dir: Optional[str] = None,
+                      workers: Optional[int] = None) -> List[Dict[str, float]]:
+        output_paths = [None] * len(input_paths)
+        if output_dir is not None and input_paths:
+            # Outputs keep their path relative to the inputs' common directory, so files
+            # with the same name in different directories do not overwrite each other
+            sources = [os.path.abspath(path) for path in input_paths]
+            root = os.path.commonpath([os.path.dirname(path) for path in sources])
+            output_paths = [os.path.join(output_dir, os.path.relpath(path, root)) for path in sources]
+            if len(set(output_paths)) != len(output_paths):
+                raise ValueError("The same input file is listed more than once")
+            for directory in {os.path.dirname(path) for path in output_paths}:
+                os.makedirs(directory, exist_ok=True)
+        if workers == 1:
+            return [self.process_file(i, o) for i, o in zip(input_paths, output_paths)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.process_file, input_paths, output_paths))
+
+def example_chain(processor: RealTimeAudioProcessor):
+    processor.add_processor(processor.low_pass_filter(3000))
+    processor.add_processor(processor.compressor(0.3, 3.0))
+
+if __name__ == "__main__":
+    # Example usage
+    processor = RealTimeAudioProcessor()
+    example_chain(processor)
+
+    def audio_callback(data):
+        # Real-time processing callback
+        pass
 
-def audio_callback(data):
-    # Real-time processing callback
-    pass
+    # Start processing in background thread
+    thread = threading.Thread(target=processor.start_recording, args=(audio_callback,))
+    thread.start()
 
-# Start processing in background thread
-thread = threading.Thread(target=processor.start_recording, args=(audio_callback,))
-thread.start()
+    # Let it run for 5 seconds
+    time.sleep(5)
+    processor.stop_recording()
 
-# Let it run for 5 seconds
-time.sleep(5)
-processor.stop_recording()
+    # Offline: run the same chain over WAV files on all cores
+    # OfflineAudioEngine(example_chain).process_files(["take1.wav", "take2.wav"], output_dir="processed")
@@ -1,9 +1,25 @@
 import spacy
 import re
+import time
+from functools import lru_cache
 from sklearn.feature_extraction.text import TfidfVectorizer
 from fuzzywuzzy import fuzz
 
-nlp = spacy.load("en_core_web_sm")
+# Skill extraction only reads part-of-speech tags, so the parser, NER and lemmatizer
+# are never loaded
+SKILL_PIPELINE_EXCLUDE = ["parser", "ner", "lemmatizer"]
+
+_load_times = {}
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    start = time.perf_counter()
+    nlp = spacy.load("en_core_web_sm", exclude=SKILL_PIPELINE_EXCLUDE)
+    _load_times["en_core_web_sm"] = time.perf_counter() - start
+    return nlp
+
+def model_load_times():
+    return dict(_load_times)
 
 def clean_text(text):
     text = re.sub(r'\n+', ' ', text)
@@ -11,7 +27,7 @@ def clean_text(text):
     return text.lower()
 
 def extract_skills(text):
-    doc = nlp(text)
+    doc = get_nlp()(text)
     skills = [token.text for token in doc if token.pos_ in ['NOUN', 'PROPN']]
     return list(set(skills))
 